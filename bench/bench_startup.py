@@ -0,0 +1,134 @@
+"""
+Cold-start budget: import time per module and first-render latency per
+page, each measured in a fresh interpreter (best of --repeat runs).
+
+    python -m bench.bench_startup [--repeat 3]
+
+Streamlit itself is imported before the module timer starts (the server
+always has it loaded); pages are timed from a cold interpreter, with a
+small parsed synthetic file in session state where the page needs one.
+Exits non-zero when anything is over budget. The Search page is left
+out: it opens the real results store under db/.
+"""
+from pathlib import Path
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# module -> import budget (ms)
+MODULE_BUDGET_MS = {
+    "core.auth": 20,
+    "core.storage": 20,
+    "core.config_table": 150,
+    "core.result": 150,
+    "core.table_view": 20,
+    "math_utils.kernels": 150,
+    "math_utils.signal_feature": 150,
+    "math_utils.summary_table": 200,
+    "core.file": 250,
+    "core.store": 250,
+    "core.loading": 250,
+    "core.figure_cache": 150,
+}
+
+# page -> (needs a parsed file, first-render budget (ms))
+PAGE_BUDGET_MS = {
+    "web_app.py": (False, 1500),
+    "pages/1_Upload.py": (False, 2000),
+    "pages/2_File_Overview.py": (True, 2500),
+    "pages/3_History.py": (False, 2000),
+    "pages/4_Table.py": (True, 5000),
+    "pages/5_Figure.py": (True, 2500),
+}
+
+_IMPORT = """
+import importlib, json, time
+import streamlit
+t0 = time.perf_counter()
+importlib.import_module({module!r})
+print(json.dumps((time.perf_counter() - t0) * 1e3))
+"""
+
+_RENDER = """
+import json, time
+from pathlib import Path
+from streamlit.testing.v1 import AppTest
+
+state = {{"authenticated": True}}
+if {needs_file!r}:
+    from bench.synthetic import write_txt
+    from core.file import File
+    path = write_txt(Path({tmp!r}) / "sweep.txt", steps=20, points=2001)
+    state["files"] = [File.from_txt(path)]
+
+at = AppTest.from_file({page!r}, default_timeout=120)
+for k, v in state.items():
+    at.session_state[k] = v
+t0 = time.perf_counter()
+at.run()
+ms = (time.perf_counter() - t0) * 1e3
+if at.exception:
+    raise SystemExit(at.exception[0].value)
+print(json.dumps(ms))
+"""
+
+
+def run_fresh(code: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def report(title: str, timings: dict, budgets: dict) -> bool:
+    ok = True
+    print(f"\n{title}")
+    print(f"{'':<28} {'ms':>9} {'budget':>9}")
+    for name, ms in timings.items():
+        over = ms > budgets[name]
+        ok &= not over
+        print(f"{name:<28} {ms:>9.1f} {budgets[name]:>9} {'OVER' if over else ''}")
+    return ok
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    modules = {
+        m: min(run_fresh(_IMPORT.format(module=m)) for _ in range(args.repeat))
+        for m in MODULE_BUDGET_MS
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pages = {
+            page: min(
+                run_fresh(_RENDER.format(page=page, needs_file=needs, tmp=tmp))
+                for _ in range(args.repeat)
+            )
+            for page, (needs, _) in PAGE_BUDGET_MS.items()
+        }
+
+    ok = report("import (after streamlit)", modules, MODULE_BUDGET_MS)
+    ok &= report(
+        "first render", pages,
+        {p: budget for p, (_, budget) in PAGE_BUDGET_MS.items()},
+    )
+    if not ok:
+        raise SystemExit("over budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Sweep tracking: warm-started track_dips vs an independent extract_dips
+per step, on a steady sweep and on sweeps where a resonance enters or
+leaves the span.
+
+Fails if tracking is not faster than the per-step scan, if a resonance
+inside the span is missing from a step (or a tracked dip is not near
+any resonance), or if a band jumps to another resonance.
+
+    python -m bench.bench_tracking
+"""
+import time
+
+import numpy as np
+
+from bench.synthetic import s21_trace, sweep_centers
+from math_utils.signal_feature import extract_dips, track_dips
+
+
+POINTS = 10001
+STEPS = 300
+REPEAT = 5
+SPAN = (1.0, 6.0)
+
+# noise (dB) -> dip settings (measured traces need the prefilter)
+NOISE = {
+    0.0: {},
+    0.2: {"min_prominence_db": 3.0, "smooth": 9},
+}
+
+# Extra resonance (GHz at er = 1) moving through the span, if any:
+# 7.0 enters below 6 GHz once er ≈ 1.4, 1.45 leaves below 1 GHz
+SWEEPS = {
+    "steady": None,
+    "entering": 7.0,
+    "leaving": 1.45,
+}
+
+# A resonance this far inside the span must be tracked (GHz)
+EDGE_MARGIN = 0.05
+
+# Tracked f0 within this of the true resonance (GHz)
+F0_TOL = 0.01
+
+
+def sweep(extra: float | None, noise_db: float) -> tuple:
+    freq = np.linspace(*SPAN, POINTS)
+    rng = np.random.default_rng(3)
+    traces, truth = [], []
+    for k in range(STEPS):
+        er = 1.0 + 0.005 * k
+        centers = sweep_centers(er)
+        if extra is not None:
+            centers.append(extra / np.sqrt(er))
+        traces.append(np.c_[freq, s21_trace(freq, centers, noise_db=noise_db, rng=rng)])
+        truth.append(np.array(centers))
+    return traces, truth
+
+
+def best_ms(fn) -> tuple:
+    best, out = np.inf, None
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, (time.perf_counter() - t0) * 1e3)
+    return best, out
+
+
+def follows_truth(tracked: list, truth: list) -> bool:
+    lo, hi = SPAN
+    for step, centers in zip(tracked, truth):
+        f0 = np.array([d.f0.f for d in step.values()])
+        inside = centers[(centers > lo + EDGE_MARGIN) & (centers < hi - EDGE_MARGIN)]
+        if any(not np.any(np.abs(f0 - c) < F0_TOL) for c in inside):
+            return False            # resonance missed
+        if any(not np.any(np.abs(centers - f) < F0_TOL) for f in f0):
+            return False            # dip away from every resonance
+    return True
+
+
+def main() -> None:
+    track_dips(sweep(None, 0.0)[0][:2])        # warm-up / JIT compile
+
+    print(f"{'sweep':<10} {'noise':>6} {'track ms':>10} {'scan ms':>10}  ok")
+    failed = []
+    for name, extra in SWEEPS.items():
+        for noise, settings in NOISE.items():
+            traces, truth = sweep(extra, noise)
+
+            t_track, tracked = best_ms(lambda: track_dips(traces, **settings))
+            t_scan, _ = best_ms(
+                lambda: [extract_dips(t, **settings) for t in traces]
+            )
+
+            # ---- a band may not jump to another resonance
+            jumps_ok = all(
+                abs(cur[b].f0.f - prev[b].f0.f) < 0.05
+                for prev, cur in zip(tracked, tracked[1:])
+                for b in cur.keys() & prev.keys()
+            )
+
+            ok = t_track < t_scan and jumps_ok and follows_truth(tracked, truth)
+            print(f"{name:<10} {noise:>6.2f} {t_track:>10.1f} {t_scan:>10.1f}  {ok}")
+            if not ok:
+                failed.append(f"{name} (noise {noise})")
+
+    if failed:
+        raise SystemExit("tracking failed: " + ", ".join(failed))
+
+
+if __name__ == "__main__":
+    main()
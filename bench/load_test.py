@@ -0,0 +1,245 @@
+"""
+Multi-session load test: N concurrent headless sessions (Streamlit
+AppTest, one process each: AppTest is not thread-safe) run restore →
+overview → table → plot on synthetic sweeps; p50 / p95 latency per
+page and the peak summed RSS of the session processes (and their
+worker processes) per level.
+
+    python -m bench.load_test --sessions 1 2 4 8 --steps 100 --points 5001
+
+The app runs from a scratch copy of the pages (db/ is created there),
+so real uploads and the results store are never touched. AppTest cannot
+drive st.file_uploader, so uploads are staged as run directories and
+parsed through the History page, which uses the same parse / analyze /
+ingest path as Upload.
+
+Each session process has its own worker pools, so this measures N
+independent app processes rather than N sessions sharing one server.
+"""
+from pathlib import Path
+from typing import Dict, List
+import argparse
+import gzip
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+PAGES = ("History", "Overview", "Table", "Figure")
+
+# Seconds between RSS samples
+SAMPLE_INTERVAL = 0.05
+
+
+# ============================================================
+# Scratch app
+# ============================================================
+
+def make_app(tmp: Path) -> Path:
+    """Scratch copy of the pages next to links to the real packages"""
+    app = tmp / "app"
+    shutil.copytree(ROOT / "pages", app / "pages")
+    shutil.copy(ROOT / "web_app.py", app / "web_app.py")
+    for pkg in ("core", "math_utils"):
+        (app / pkg).symlink_to(ROOT / pkg)
+    return app
+
+
+def stage_run(app: Path, run_id: str, txt: Path) -> None:
+    run_dir = app / "db" / "upload" / run_id
+    run_dir.mkdir(parents=True)
+    with txt.open("rb") as src, gzip.open(run_dir / "sweep.txt.gz", "wb") as dst:
+        shutil.copyfileobj(src, dst)
+
+
+# ============================================================
+# One session
+# ============================================================
+
+def session(app: Path, run_id: str) -> Dict[str, float]:
+    """One session, in this process: seconds per page"""
+    from streamlit.testing.v1 import AppTest
+
+    sys.path.insert(0, str(app))
+    timings: Dict[str, float] = {}
+
+    def page(name: str) -> "AppTest":
+        at = AppTest.from_file(str(app / "pages" / name), default_timeout=600)
+        at.session_state["authenticated"] = True
+        return at
+
+    def timed(key: str, at) -> None:
+        t0 = time.perf_counter()
+        at.run()
+        timings[key] = time.perf_counter() - t0
+        if at.exception:
+            raise RuntimeError(f"{key}: {at.exception[0].value}")
+
+    # ---- upload (restore a staged run)
+    at = page("3_History.py")
+    at.run()
+    at.selectbox[0].set_value(run_id)
+    at.button[0].click()
+    timed("History", at)
+    files = at.session_state["files"]
+
+    for key, name, action in (
+        ("Overview", "2_File_Overview.py", None),
+        ("Table", "4_Table.py", None),
+        ("Figure", "5_Figure.py", "Plot"),
+    ):
+        at = page(name)
+        at.session_state["files"] = files
+        if action:
+            at.run()
+            next(b for b in at.button if b.label == action).click()
+        timed(key, at)
+
+    return timings
+
+
+def start_session(app: Path, run_id: str) -> subprocess.Popen:
+    """Session child; stdout / stderr go to <run_id>.out / .err"""
+    logs = app.parent / "logs"
+    logs.mkdir(exist_ok=True)
+    with (logs / f"{run_id}.out").open("w") as out, \
+            (logs / f"{run_id}.err").open("w") as err:
+        return subprocess.Popen(
+            [sys.executable, "-m", "bench.load_test",
+             "--session", str(app), run_id],
+            cwd=ROOT, stdout=out, stderr=err,
+        )
+
+
+def session_result(app: Path, run_id: str, proc: subprocess.Popen) -> Dict[str, float]:
+    """Timings reported by a finished session child"""
+    logs = app.parent / "logs"
+    if proc.returncode:
+        err = (logs / f"{run_id}.err").read_text().strip().splitlines()
+        raise RuntimeError(err[-1] if err else f"exit code {proc.returncode}")
+    return json.loads((logs / f"{run_id}.out").read_text().strip().splitlines()[-1])
+
+
+# ============================================================
+# Memory
+# ============================================================
+
+def _statm_rss(pid: int) -> int:
+    with open(f"/proc/{pid}/statm") as fh:
+        return int(fh.read().split()[1]) * resource.getpagesize()
+
+
+def _children() -> Dict[int, List[int]]:
+    """ppid -> pids, from /proc"""
+    tree: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as fh:
+                # pid (comm) state ppid ...; comm may contain spaces
+                ppid = int(fh.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        tree.setdefault(ppid, []).append(int(entry))
+    return tree
+
+
+def tree_rss(pids: List[int]) -> int:
+    """Summed RSS of the given processes and all their descendants"""
+    tree = _children()
+    total, todo = 0, list(pids)
+    while todo:
+        pid = todo.pop()
+        try:
+            total += _statm_rss(pid)
+        except OSError:
+            continue        # exited meanwhile
+        todo.extend(tree.get(pid, []))
+    return total
+
+
+def wait_sampling(procs: List[subprocess.Popen]) -> int:
+    """Wait for the session processes; peak summed RSS (bytes)"""
+    if not os.path.isdir("/proc"):
+        for p in procs:
+            p.wait()
+        # no /proc: only the largest single child is known
+        return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+
+    peak = 0
+    while any(p.poll() is None for p in procs):
+        peak = max(peak, tree_rss([p.pid for p in procs]))
+        time.sleep(SAMPLE_INTERVAL)
+    return peak
+
+
+# ============================================================
+# Driver
+# ============================================================
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8])
+    ap.add_argument("--steps", type=int, default=100)
+    ap.add_argument("--points", type=int, default=5001)
+    ap.add_argument("--noise", type=float, default=0.1)
+    ap.add_argument("--session", nargs=2, metavar=("APP", "RUN_ID"),
+                    help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.session:
+        # ---- child: run one session, report timings on stdout
+        app, run_id = args.session
+        print(json.dumps(session(Path(app), run_id)))
+        return
+
+    from bench.synthetic import write_txt
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        app = make_app(tmp)
+        txt = write_txt(tmp / "sweep.txt", args.steps, args.points, noise_db=args.noise)
+
+        print(f"{args.steps} steps x {args.points} points per session")
+        print(f"{'sessions':>8} {'page':<9} {'p50 s':>8} {'p95 s':>8}  {'peak RSS':>9}")
+
+        for level, n in enumerate(args.sessions):
+            run_ids = [f"load-{level}-{i:03d}" for i in range(n)]
+            for run_id in run_ids:
+                stage_run(app, run_id, txt)
+
+            procs = [start_session(app, run_id) for run_id in run_ids]
+            peak = wait_sampling(procs)
+
+            timings: Dict[str, List[float]] = {p: [] for p in PAGES}
+            errors: list = []
+            for run_id, proc in zip(run_ids, procs):
+                try:
+                    result = session_result(app, run_id, proc)
+                except RuntimeError as e:
+                    errors.append(e)
+                    continue
+                for key, t in result.items():
+                    timings[key].append(t)
+
+            if errors:
+                raise SystemExit(f"{len(errors)} session(s) failed: {errors[0]}")
+
+            for i, p in enumerate(PAGES):
+                p50, p95 = np.percentile(timings[p], [50, 95])
+                mem = f"{peak / 2**20:>7.0f}MB" if i == 0 else ""
+                print(f"{n if i == 0 else '':>8} {p:<9} {p50:>8.2f} {p95:>8.2f}  {mem:>9}")
+
+
+if __name__ == "__main__":
+    main()
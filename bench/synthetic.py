@@ -0,0 +1,73 @@
+"""
+Synthetic CST-style workloads for the benchmarks.
+
+    python -m bench.synthetic out.txt --steps 300 --points 10001 --noise 0.2
+"""
+from pathlib import Path
+from typing import Sequence
+import argparse
+
+import numpy as np
+
+
+# Resonances (GHz at er = 1) used by every synthetic sweep
+CENTERS = (2.5, 4.0)
+
+
+def s21_trace(
+    freq: np.ndarray,
+    centers: Sequence[float],
+    depth_db: float = 30.0,
+    width: float = 0.03,
+    noise_db: float = 0.0,
+    rng: np.random.Generator | None = None,
+) -> np.ndarray:
+    """Lorentzian notches (dB) plus optional white measurement noise"""
+    s21 = np.zeros_like(freq)
+    for c in centers:
+        s21 -= depth_db / (1 + ((freq - c) / width) ** 2)
+    if noise_db > 0:
+        rng = rng or np.random.default_rng(0)
+        s21 += rng.normal(0.0, noise_db, len(freq))
+    return s21
+
+
+def sweep_centers(er: float) -> list:
+    """Resonance positions for a permittivity step"""
+    return [c / np.sqrt(er) + 0.5 for c in CENTERS]
+
+
+def write_txt(
+    path: Path,
+    steps: int = 300,
+    points: int = 10001,
+    er_step: float = 0.005,
+    noise_db: float = 0.0,
+    seed: int = 0,
+) -> Path:
+    """Write an er sweep in CST TXT export format"""
+    rng = np.random.default_rng(seed)
+    freq = np.linspace(1.0, 6.0, points)
+
+    with Path(path).open("w") as fh:
+        for k in range(steps):
+            er = 1.0 + er_step * k
+            fh.write(f"#Parameters = {{er={er:g}; h=1.6; tan_delta=0.02}}\n")
+            fh.write('#"Frequency / GHz"\t"S2,1 [Magnitude in dB]"\n')
+            fh.write("#" + "-" * 40 + "\n")
+            s21 = s21_trace(freq, sweep_centers(er), noise_db=noise_db, rng=rng)
+            np.savetxt(fh, np.c_[freq, s21], fmt="%.6f", delimiter="\t")
+            fh.write("\n")
+
+    return Path(path)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("path", type=Path)
+    ap.add_argument("--steps", type=int, default=300)
+    ap.add_argument("--points", type=int, default=10001)
+    ap.add_argument("--er-step", type=float, default=0.005)
+    ap.add_argument("--noise", type=float, default=0.0)
+    args = ap.parse_args()
+    write_txt(args.path, args.steps, args.points, args.er_step, args.noise)
@@ -1,3 +1,5 @@
+import uuid
+
 import streamlit as st
 
 
@@ -13,6 +15,11 @@ def login(username: str, password: str) -> bool:
     return False
 
 
+def session_id() -> str:
+    """Stable id of the browser session (for per-session scheduling)"""
+    return st.session_state.setdefault("session_id", uuid.uuid4().hex)
+
+
 def require_login():
     if not is_authenticated():
         st.switch_page("web_app.py")
@@ -0,0 +1,128 @@
+from typing import Dict, Iterator, List, Mapping, Tuple
+import sys
+
+import numpy as np
+
+
+class ConfigTable:
+    """
+    File-level storage for every Result's config and description.
+
+    - configs: one float64 row per result, one column per (interned)
+      parameter name; NaN marks a parameter the block does not have
+    - descriptions: deduplicated tuples, referenced by index
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.names: List[str] = []
+        self._col: Dict[str, int] = {}
+        self.values = np.full((capacity, 0), np.nan)
+        self.n_rows = 0
+
+        self._descriptions: List[Tuple[str, ...]] = []
+        self._desc_id: Dict[Tuple[str, ...], int] = {}
+        self._row_desc: List[int] = []
+
+    # ----------------------
+    # Writing
+    # ----------------------
+    def add(self, config: Dict[str, float]) -> int:
+        """Append one config row; returns its row index"""
+        for k in config:
+            if k not in self._col:
+                self._add_column(k)
+
+        if self.n_rows == len(self.values):
+            grown = np.full((2 * len(self.values), len(self.names)), np.nan)
+            grown[:self.n_rows] = self.values
+            self.values = grown
+
+        row = self.n_rows
+        for k, v in config.items():
+            self.values[row, self._col[k]] = v
+        self._row_desc.append(-1)
+        self.n_rows += 1
+        return row
+
+    def _add_column(self, name: str) -> None:
+        name = sys.intern(name)
+        self._col[name] = len(self.names)
+        self.names.append(name)
+        self.values = np.hstack(
+            [self.values, np.full((len(self.values), 1), np.nan)]
+        )
+
+    def set_description(self, row: int, description: List[str]) -> None:
+        key = tuple(sys.intern(s) for s in description)
+        desc_id = self._desc_id.get(key)
+        if desc_id is None:
+            desc_id = self._desc_id[key] = len(self._descriptions)
+            self._descriptions.append(key)
+        self._row_desc[row] = desc_id
+
+    # ----------------------
+    # Reading
+    # ----------------------
+    def view(self, row: int) -> "ConfigView":
+        return ConfigView(self, row)
+
+    def description(self, row: int) -> List[str]:
+        desc_id = self._row_desc[row]
+        return list(self._descriptions[desc_id]) if desc_id >= 0 else []
+
+    def column(self, name: str) -> np.ndarray:
+        """All rows' values of one parameter (NaN where missing)"""
+        return self.values[:self.n_rows, self._col[name]]
+
+    def memory_usage(self) -> Dict[str, int]:
+        return {
+            "config_values": self.values.nbytes,
+            "config_names": sum(sys.getsizeof(n) for n in self.names),
+            "descriptions": sum(
+                sys.getsizeof(d) + sum(sys.getsizeof(s) for s in d)
+                for d in self._descriptions
+            ) + sys.getsizeof(self._row_desc),
+            "unique_descriptions": len(self._descriptions),
+        }
+
+
+class ConfigView(Mapping):
+    """
+    Read-only dict-like view of one ConfigTable row
+    (what Result.config returns for parsed results).
+    """
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: ConfigTable, row: int):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, key: str) -> float:
+        col = self._table._col.get(key)
+        if col is None:
+            raise KeyError(key)
+        v = self._table.values[self._row, col]
+        if v != v:                      # NaN: not set for this block
+            raise KeyError(key)
+        return float(v)
+
+    def __contains__(self, key) -> bool:
+        col = self._table._col.get(key)
+        if col is None:
+            return False
+        v = self._table.values[self._row, col]
+        return v == v
+
+    def __iter__(self) -> Iterator[str]:
+        row = self._table.values[self._row]
+        names = self._table.names
+        for j in np.flatnonzero(~np.isnan(row[:len(names)])):
+            yield names[j]
+
+    def __len__(self) -> int:
+        row = self._table.values[self._row]
+        return int((~np.isnan(row)).sum())
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
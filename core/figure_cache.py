@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from typing import Callable, Hashable, List, Tuple
+
+import numpy as np
+import plotly.graph_objects as go
+
+
+# ============================================================
+# Trace preparation
+# ============================================================
+
+def decimate_minmax(
+    x: np.ndarray,
+    y: np.ndarray,
+    max_points: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Keep the min and max sample of each bucket (plus both ends), so
+    narrow resonance dips survive decimation. max_points <= 0 keeps all.
+    """
+    n = len(y)
+    if max_points <= 0 or n <= max_points:
+        return x, y
+
+    buckets = max(max_points // 2, 1)
+    size = -(-n // buckets)
+    padded = np.pad(y, (0, buckets * size - n), mode="edge").reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+
+    idx = np.concatenate([
+        [0, n - 1],
+        offsets + padded.argmin(axis=1),
+        offsets + padded.argmax(axis=1),
+    ])
+    idx = np.unique(np.clip(idx, 0, n - 1))
+    return x[idx], y[idx]
+
+
+def prepare_trace(
+    freq: np.ndarray,
+    s21: np.ndarray,
+    max_points: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Decimated, compact float32 arrays (sent to the browser as binary)"""
+    x, y = decimate_minmax(freq, s21, max_points)
+    return x.astype(np.float32), y.astype(np.float32)
+
+
+# ============================================================
+# Per-session caches
+# ============================================================
+
+class TraceCache:
+    """
+    LRU cache of prepared trace arrays, keyed by
+    (file, result, decimation settings).
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[Hashable, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+
+    def get(
+        self,
+        key: Hashable,
+        build: Callable[[], Tuple[np.ndarray, np.ndarray]],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if key in self._items:
+            self._items.move_to_end(key)
+            return self._items[key]
+
+        value = self._items[key] = build()
+        if len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+        return value
+
+
+class FigureState:
+    """
+    A figure kept across reruns: sync() adds only new traces, removes
+    deselected ones and renames the rest, instead of rebuilding.
+    """
+
+    def __init__(self):
+        self.fig = go.Figure()
+        self.traces = TraceCache()
+
+    def sync(
+        self,
+        wanted: List[Tuple[Hashable, str, Callable]],
+    ) -> go.Figure:
+        """
+        wanted: (key, legend name, build -> (x, y)) in display order.
+        """
+        uids = [repr(key) for key, _, _ in wanted]
+        keep = set(uids)
+
+        # ---- remove deselected traces
+        current = [t for t in self.fig.data if t.uid in keep]
+        if len(current) != len(self.fig.data):
+            self.fig.data = tuple(current)
+
+        # ---- add new traces
+        have = {t.uid for t in self.fig.data}
+        for uid, (key, name, build) in zip(uids, wanted):
+            if uid in have:
+                continue
+            x, y = self.traces.get(key, build)
+            self.fig.add_trace(go.Scatter(
+                x=x, y=y, mode="lines", name=name, uid=uid
+            ))
+
+        # ---- order and legend names
+        names = dict(zip(uids, (name for _, name, _ in wanted)))
+        order = {uid: i for i, uid in enumerate(uids)}
+        traces = sorted(self.fig.data, key=lambda t: order[t.uid])
+        if [t.uid for t in traces] != [t.uid for t in self.fig.data]:
+            self.fig.data = tuple(traces)
+        for t in self.fig.data:
+            if t.name != names[t.uid]:
+                t.name = names[t.uid]
+
+        return self.fig
@@ -1,13 +1,48 @@
 from pathlib import Path
-from typing import List, Dict
+from typing import TYPE_CHECKING, List, Dict, Iterable, Iterator, Callable, Tuple
+from array import array
+from contextlib import contextmanager
 import csv
 import io
+import mmap
+import sys
+import tempfile
+import threading
+import uuid
+import weakref
 from collections import defaultdict, Counter
 
-import pandas as pd
+import numpy as np
 
 from .result import Result
-from math_utils.signal_feature import extract_dips
+from .config_table import ConfigTable
+from .storage import is_compressed, open_text
+from .pipeline import Pipeline
+from math_utils.signal_feature import extract_dips, DipSettings
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Files at least this large are parsed in memory-mapped mode
+LARGE_FILE_BYTES = 256 * 1024 * 1024
+
+# Same threshold for compressed uploads (CST TXT compresses ~10x)
+COMPRESSED_LARGE_FILE_BYTES = LARGE_FILE_BYTES // 10
+
+# Mapped mode: bytes of TXT decoded per chunk / points buffered per flush
+MAPPED_CHUNK_BYTES = 16 * 1024 * 1024
+MAPPED_FLUSH_POINTS = 1 << 20
+
+# Mapped mode: private binary point stores (one per File, removed with it)
+STORE_DIR = Path(tempfile.gettempdir()) / "le701-stores"
+
+
+def _remove_store(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass
 
 
 class File:
@@ -20,47 +55,298 @@ class File:
         self.display_name: str = display_name or path.name
         self.results: List[Result] = []
 
-        # Sweep overview (built after parsing)
-        self.overview: Dict[str, pd.DataFrame] = {}
+        # Shared config / description storage for all results
+        self.configs: ConfigTable = ConfigTable()
+
+        # Binary point store (large-file mode only; a given path must
+        # not exist yet, otherwise a private one is created in STORE_DIR)
+        self.store_path: Path | None = None
+
+        # result index -> (first point, point count) in the store, for
+        # results whose data is mapped from it
+        self._store_spans: Dict[int, Tuple[int, int]] = {}
+
+        # Parse state: "pending" until stream() starts, then "parsing",
+        # then "parsed", "failed" (load_error says why) or "interrupted"
+        # (the reader stopped before the end of the file)
+        self.parse_state: str = "pending"
+        self.load_error: str | None = None
+
+        # Sweep overview (incremental per-parameter value sets;
+        # DataFrames are rebuilt lazily on access)
+        self._param_values: Dict[str, Dict[float, None]] = defaultdict(dict)
+        self._overview: Dict[str, "pd.DataFrame"] = {}
+        self._overview_dirty: bool = False
+
+        # Dip extraction settings (e.g. prominence prefilter for
+        # measured traces)
+        self.dip_settings: DipSettings = DipSettings()
+
+        # Dip-count histogram over analyzed results
+        self._dip_counts: Counter = Counter()
+
+        # Cached analysis stages (tracked bands, summary tables, ...)
+        self.pipeline: Pipeline = Pipeline(self)
+
+        # Guards the overview and the per-result analysis: a background
+        # load(analyze=True) and the pages may touch them concurrently
+        self._lock = threading.RLock()
+
+    # Files are copied / pickled by Streamlit widgets; locks cannot be
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
 
     # ======================
     # Parsing
     # ======================
     @classmethod
     def from_txt(cls, path: Path, display_name: str | None = None) -> "File":
+        return cls(path, display_name).load()
+
+    @classmethod
+    def from_txt_mapped(
+        cls,
+        path: Path,
+        display_name: str | None = None,
+        store_path: Path | None = None,
+    ) -> "File":
+        """
+        Large-file mode (see stream(mapped=True)).
+        """
         file_obj = cls(path, display_name)
-        current_result: Result | None = None
+        file_obj.store_path = store_path
+        for _ in file_obj.stream(mapped=True):
+            pass
+        return file_obj
 
-        with path.open("r", encoding="utf-8", errors="ignore") as f:
-            for raw_line in f:
-                line = raw_line.strip()
-                if not line:
-                    continue
+    def load(self, analyze: bool = False) -> "File":
+        """
+        Parse the whole file (stream() to the end); returns self.
+        """
+        for _ in self.stream(analyze=analyze):
+            pass
+        return self
 
-                if line.startswith("#Parameters"):
-                    current_result = Result()
-                    current_result.config = cls._parse_config(line)
-                    file_obj.results.append(current_result)
-                    continue
+    def stream(
+        self,
+        mapped: bool | None = None,
+        analyze: bool = False,
+    ) -> Iterator[Result]:
+        """
+        Parse the file progressively, yielding each Result as soon as
+        its block is finished. self.results, the sweep overview and
+        (with analyze=True) the dip counts are updated before each yield.
 
-                if line.startswith('#"') and current_result:
-                    current_result.description = cls._parse_description(line[1:])
-                    continue
+        mapped=None picks the large-file mode from the file size.
+        """
+        self.parse_state = "parsing"
+        self.load_error = None
+        try:
+            if mapped is None:
+                limit = (
+                    COMPRESSED_LARGE_FILE_BYTES if is_compressed(self.path)
+                    else LARGE_FILE_BYTES
+                )
+                mapped = self.path.stat().st_size >= limit
 
-                if line.startswith("#"):
-                    continue
+            blocks = self._stream_mapped() if mapped else self._stream_plain()
+
+            for r in blocks:
+                self.results.append(r)
+                self._add_to_overview(r)
+                if analyze:
+                    self._analyze(r)
+                yield r
+        except Exception as e:
+            self.parse_state = "failed"
+            self.load_error = str(e)
+            raise
+        else:
+            self.parse_state = "parsed"
+        finally:
+            if self.parse_state == "parsing":
+                self.parse_state = "interrupted"
+
+    @property
+    def parsed(self) -> bool:
+        return self.parse_state == "parsed"
+
+    def _stream_plain(self) -> Iterator[Result]:
+        def add_point(result: Result, x: float, y: float) -> None:
+            result.data.append((x, y))
+
+        with open_text(self.path) as f:
+            for r in self._parse_lines(f, add_point):
+                # ---- finished block: pack points into one (N, 2) array
+                r.data = np.asarray(r.data, dtype=float).reshape(-1, 2)
+                yield r
+
+    def _stream_mapped(self) -> Iterator[Result]:
+        """
+        Large-file mode.
+
+        The TXT is memory-mapped (or stream-decompressed, for compressed
+        uploads) and decoded chunk by chunk; points are streamed into a
+        float64 (N, 2) binary store private to this File (deleted when
+        the File is garbage-collected), and each Result.data becomes a
+        read-only view into that store. An existing store is never
+        overwritten, so other Files' live mappings stay valid.
+        Resident memory stays bounded by the chunk sizes.
+
+        Blocks still in the write buffer are yielded with a private copy
+        of their points and re-pointed into the store on the next flush.
+        """
+        if self.store_path is None:
+            STORE_DIR.mkdir(parents=True, exist_ok=True)
+            self.store_path = (
+                STORE_DIR / f"{self.path.name}-{uuid.uuid4().hex}.f64"
+            )
+            weakref.finalize(self, _remove_store, self.store_path)
+
+        buf = array("d")
+        spans: Dict[int, List[int]] = {}     # id(result) -> [start, count]
+        pending: List[Result] = []          # yielded, data not yet mapped
+        done: List[Result] = []
+        first = len(self.results)           # index of done[0]
+        index: Dict[int, int] = {}          # id(result) -> result index
+        total = 0                           # points seen
+        flushed = 0                         # points written to the store
+
+        with self.store_path.open("xb") as out:
+
+            def flush() -> None:
+                nonlocal flushed
+                buf.tofile(out)
+                out.flush()
+                del buf[:]
+                flushed = total
+                store = self._map_store(total)
+                for r in pending:
+                    start, count = spans[id(r)]
+                    r.data = store[start:start + count]
+                    self._store_spans[index[id(r)]] = (start, count)
+                pending.clear()
+
+            def add_point(result: Result, x: float, y: float) -> None:
+                nonlocal total
+                span = spans.setdefault(id(result), [total, 0])
+                span[1] += 1
+                total += 1
+                buf.append(x)
+                buf.append(y)
+                if len(buf) >= 2 * MAPPED_FLUSH_POINTS:
+                    flush()
+
+            with self._open_lines(self.path) as lines:
+                for r in self._parse_lines(lines, add_point):
+                    start, count = spans.setdefault(id(r), [total, 0])
+                    index[id(r)] = first + len(done)
+                    pending.append(r)
+                    done.append(r)
+                    if start < flushed:
+                        flush()
+                    else:
+                        lo = 2 * (start - flushed)
+                        r.data = np.array(
+                            buf[lo:lo + 2 * count]
+                        ).reshape(-1, 2)
+                    yield r
+
+            flush()
+
+        # ---- one final mapping for every block
+        store = self._map_store(total)
+        for i, r in enumerate(done, first):
+            start, count = spans[id(r)]
+            r.data = store[start:start + count]
+            self._store_spans[i] = (start, count)
+
+    def store_span(self, i: int) -> Tuple[int, int] | None:
+        """
+        (first point, point count) of results[i] in store_path while its
+        data is mapped from there (large-file mode), else None.
+        """
+        return self._store_spans.get(i)
 
+    def _map_store(self, n_points: int) -> np.ndarray:
+        if n_points == 0:
+            return np.empty((0, 2))
+        return np.memmap(
+            self.store_path, dtype=np.float64, mode="r",
+            shape=(n_points, 2)
+        )
+
+    def _parse_lines(
+        self,
+        lines: Iterable[str],
+        add_point: Callable[[Result, float, float], None],
+    ) -> Iterator[Result]:
+        current_result: Result | None = None
+
+        for raw_line in lines:
+            line = raw_line.strip()
+            if not line:
+                continue
+
+            if line.startswith("#Parameters"):
                 if current_result:
-                    parts = line.split()
-                    if len(parts) == 2:
-                        try:
-                            x, y = map(float, parts)
-                            current_result.data.append((x, y))
-                        except ValueError:
-                            pass
-
-        file_obj._build_overview()
-        return file_obj
+                    yield current_result
+                current_result = Result()
+                current_result.bind(
+                    self.configs, self.configs.add(self._parse_config(line))
+                )
+                continue
+
+            if line.startswith('#"') and current_result:
+                current_result.description = self._parse_description(line[1:])
+                continue
+
+            if line.startswith("#"):
+                continue
+
+            if current_result:
+                parts = line.split()
+                if len(parts) == 2:
+                    try:
+                        x, y = map(float, parts)
+                        add_point(current_result, x, y)
+                    except ValueError:
+                        pass
+
+        if current_result:
+            yield current_result
+
+    @classmethod
+    @contextmanager
+    def _open_lines(cls, path: Path) -> Iterator[Iterable[str]]:
+        if is_compressed(path):
+            with open_text(path) as f:
+                yield f
+            return
+
+        with path.open("rb") as f:
+            if path.stat().st_size == 0:
+                yield []
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield cls._iter_mapped_lines(mm)
+
+    @staticmethod
+    def _iter_mapped_lines(mm: mmap.mmap) -> Iterable[str]:
+        size = len(mm)
+        pos = 0
+        while pos < size:
+            end = mm.find(b"\n", min(pos + MAPPED_CHUNK_BYTES, size))
+            end = size if end == -1 else end + 1
+            chunk = mm[pos:end].decode("utf-8", errors="ignore")
+            yield from chunk.splitlines()
+            pos = end
 
     # ======================
     # Parsing helpers
@@ -82,57 +368,154 @@ class File:
     # ======================
     # Sweep overview
     # ======================
-    def _build_overview(self) -> None:
-        self.overview = {}
-        if not self.results:
-            return
+    @property
+    def overview(self) -> Dict[str, "pd.DataFrame"]:
+        with self._lock:
+            if self._overview_dirty:
+                self._build_overview()
+            return self._overview
 
-        param_values = defaultdict(list)
-        for r in self.results:
+    def _add_to_overview(self, r: Result) -> None:
+        with self._lock:
             for k, v in r.config.items():
-                param_values[k].append(v)
+                values = self._param_values[k]
+                if v not in values:
+                    values[v] = None
+                    self._overview_dirty = True
 
-        for sweep_param, values in param_values.items():
-            uniq = sorted(set(values))
-            if len(uniq) <= 1:
-                continue
+    def _build_overview(self) -> None:
+        import pandas as pd
 
-            rows = [{
-                "Parameter": f"[SWEEP] {sweep_param}",
-                "Value(s)": ", ".join(map(str, uniq))
-            }]
+        with self._lock:
+            self._overview = {}
+            self._overview_dirty = False
 
-            for p, vals in param_values.items():
-                if p == sweep_param:
+            param_values = self._param_values
+
+            for sweep_param, values in param_values.items():
+                uniq = sorted(values)
+                if len(uniq) <= 1:
                     continue
-                if len(set(vals)) == 1:
-                    rows.append({
-                        "Parameter": p,
-                        "Value(s)": str(vals[0])
-                    })
 
-            self.overview[sweep_param] = pd.DataFrame(rows)
+                rows = [{
+                    "Parameter": f"[SWEEP] {sweep_param}",
+                    "Value(s)": ", ".join(map(str, uniq))
+                }]
+
+                for p, vals in param_values.items():
+                    if p == sweep_param:
+                        continue
+                    if len(vals) == 1:
+                        rows.append({
+                            "Parameter": p,
+                            "Value(s)": str(next(iter(vals)))
+                        })
+
+                self._overview[sweep_param] = pd.DataFrame(rows)
 
     # ======================
     # Dip analysis (compute once)
     # ======================
     def analyze_bands_once(self) -> None:
         for r in self.results:
-            if r.n_bands > 0 or not r.band_valid:
-                continue
+            self._analyze(r)
+
+    def _analyze(self, r: Result) -> None:
+        # check and set under one lock: a result analyzed concurrently
+        # by the loader and the page is counted once
+        with self._lock:
+            if r.analyzed:
+                return
             try:
-                bands = extract_dips(r.data)
+                bands = extract_dips(r.data, **self.dip_settings.kwargs())
                 r.set_bands(bands)
+                self._dip_counts[r.n_bands] += 1
             except Exception:
                 r.invalidate_bands()
 
+    def set_dip_settings(self, settings: DipSettings) -> None:
+        """
+        Change the dip settings. Parsed data and the overview are kept;
+        per-result bands are re-extracted on the next analysis and the
+        pipeline re-tracks (its fingerprints include the settings).
+        """
+        with self._lock:
+            if settings == self.dip_settings:
+                return
+            self.dip_settings = settings
+            for r in self.results:
+                r.analyzed = False
+                r.band_valid = True
+            self._dip_counts.clear()
+
     # ======================
     # Dip summary (for UI)
     # ======================
     def dip_summary(self) -> Dict[str, int | None]:
-        counts = Counter(
-            r.n_bands for r in self.results if r.band_valid
+        with self._lock:
+            counts = self._dip_counts
+            if not counts:
+                return {"expected": None}
+            return {"expected": counts.most_common(1)[0][0]}
+
+    def progress_text(self) -> str:
+        """
+        One-line parse status for progressive rendering.
+        """
+        parts = [f"**{self.display_name}**: {len(self.results)} blocks"]
+        if self.overview:
+            parts.append("sweep: " + ", ".join(f"`{p}`" for p in self.overview))
+        dip = self.dip_summary()["expected"]
+        if dip is not None:
+            parts.append(f"dips: {dip}")
+        if self.parse_state in ("pending", "parsing"):
+            parts.append("parsing…")
+        elif self.parse_state != "parsed":
+            parts.append(self.parse_state)
+        return " · ".join(parts)
+
+    # ======================
+    # Memory accounting
+    # ======================
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Approximate resident bytes by component, plus what per-result
+        config dicts / description lists would have cost.
+        """
+        report: Dict[str, int] = {
+            "results": len(self.results),
+            "result_objects": sum(sys.getsizeof(r) for r in self.results),
+        }
+
+        points = mapped = 0
+        for r in self.results:
+            if isinstance(r.data, np.memmap) or (
+                isinstance(r.data, np.ndarray)
+                and isinstance(r.data.base, np.memmap)
+            ):
+                mapped += r.data.nbytes
+            elif isinstance(r.data, np.ndarray):
+                points += r.data.nbytes
+            elif len(r.data):
+                # list of (float, float) tuples
+                x, y = r.data[0]
+                per_point = (
+                    8 + sys.getsizeof(r.data[0])
+                    + sys.getsizeof(x) + sys.getsizeof(y)
+                )
+                points += sys.getsizeof(r.data) + len(r.data) * per_point
+        report["points"] = points
+        report["points_mapped"] = mapped
+
+        report.update(self.configs.memory_usage())
+
+        # ---- equivalent per-result dict / list storage
+        report["config_dicts_equivalent"] = sum(
+            sys.getsizeof(dict(r.config)) + sys.getsizeof(0.0) * len(r.config)
+            for r in self.results
+        )
+        report["description_lists_equivalent"] = sum(
+            sys.getsizeof(d) + sum(sys.getsizeof(s) for s in d)
+            for d in (r.description for r in self.results)
         )
-        if not counts:
-            return {"expected": None}
-        return {"expected": counts.most_common(1)[0][0]}
+        return report
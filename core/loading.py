@@ -0,0 +1,42 @@
+from typing import List
+
+import streamlit as st
+
+from .auth import session_id
+from .file import File
+from .store import ResultStore
+from .workers import get_pool, wait
+
+
+# Minimum seconds between progress redraws while parsing
+PROGRESS_INTERVAL = 0.5
+
+
+def load_run(
+    run_id: str,
+    files: List[File],
+    store: ResultStore,
+    register: bool = True,
+) -> None:
+    """
+    Parse and analyze the files of a run on the shared worker pool,
+    with a live progress line per file, then index the run in the
+    results store (unless it already is).
+
+    With register=True the files become the session's files as soon as
+    they are queued, so other pages can use the blocks parsed so far.
+    Raises PoolBusy when other sessions fill the pool.
+    """
+    pool = get_pool()
+    jobs = pool.submit_map(session_id(), File.load, files, analyze=True)
+
+    if register:
+        st.session_state["files"] = files
+        st.session_state["current_run_id"] = run_id
+
+    for f, job in zip(files, jobs):
+        status = st.empty()
+        wait(job, lambda: status.markdown(f.progress_text()), PROGRESS_INTERVAL)
+
+    if run_id not in store.indexed_runs():
+        pool.run(session_id(), store.ingest, run_id, files)
@@ -0,0 +1,213 @@
+from collections import Counter, OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Sequence, Tuple
+import hashlib
+import threading
+
+import numpy as np
+
+from math_utils.signal_feature import track_dips
+from math_utils.summary_table import (
+    add_shift_metrics,
+    band_arrays,
+    build_band_table,
+    order_sweep,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from .file import File
+    from .result import Result
+
+
+# ============================================================
+# Stage graph
+# ============================================================
+#
+# parse → overview
+#       → bands → band_table → summary
+#               → figure
+#
+# parse and overview are kept up to date by File itself (stream() /
+# the overview dirty flag); the Pipeline caches the analysis stages.
+#
+# Each call works on one snapshot of file.results (the loader may still
+# be appending): its fingerprints and every stage it builds see the
+# same results. Results are only ever appended, so the snapshot length
+# identifies it.
+
+# stage -> upstream stages
+STAGES: Dict[str, Tuple[str, ...]] = {
+    "parse": (),
+    "overview": ("parse",),
+    "bands": ("parse",),             # dips tracked along one sweep
+    "band_table": ("bands",),        # summary without er_base columns
+    "summary": ("band_table",),      # + shift / sensitivity columns
+    "figure": ("bands",),            # band feature matrices
+}
+
+# stage -> parameters it reads (besides its upstream stages)
+STAGE_INPUTS: Dict[str, Tuple[str, ...]] = {
+    "parse": (),
+    "overview": (),
+    "bands": ("sweep_param", "dip_settings"),
+    "band_table": ("extra_thresholds",),
+    "summary": ("er_base",),
+    "figure": (),
+}
+
+# Outputs kept per stage (older fingerprints are dropped)
+KEEP_OUTPUTS = 4
+
+
+def fingerprint(*parts: Any) -> str:
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+
+
+class Pipeline:
+    """
+    Cached analysis stages of one File.
+
+    Each stage output is stored under a fingerprint of its own inputs
+    and its upstream fingerprints, so a changed setting recomputes
+    only the stages downstream of it: a new er_base re-derives the
+    shift / sensitivity columns from the cached band table, while new
+    dip settings re-track the bands (parsing is never repeated).
+    """
+
+    def __init__(self, file: "File"):
+        self.file = file
+        self.runs: Counter = Counter()      # stage -> times computed
+        self._outputs: Dict[str, "OrderedDict[str, Any]"] = {
+            stage: OrderedDict() for stage in STAGES
+        }
+        self._lock = threading.RLock()
+
+    # Files are copied / pickled by Streamlit widgets; locks cannot be
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    # ----------------------
+    # Fingerprints
+    # ----------------------
+    def snapshot(self) -> List["Result"]:
+        """The results parsed so far"""
+        return list(self.file.results)
+
+    def fingerprint(self, stage: str, **params: Any) -> str:
+        if stage == "parse":
+            results = params.get("results")
+            if results is None:
+                results = self.file.results
+            own: tuple = (str(self.file.path), len(results))
+        else:
+            params.setdefault("dip_settings", self.file.dip_settings)
+            own = tuple(params.get(k) for k in STAGE_INPUTS[stage])
+        upstream = tuple(self.fingerprint(u, **params) for u in STAGES[stage])
+        return fingerprint(stage, own, upstream)
+
+    def _run(self, stage: str, build: Callable[[], Any], **params: Any) -> Any:
+        with self._lock:
+            fp = self.fingerprint(stage, **params)
+            outputs = self._outputs[stage]
+            if fp in outputs:
+                outputs.move_to_end(fp)
+                return outputs[fp]
+
+            value = outputs[fp] = build()
+            self.runs[stage] += 1
+            if len(outputs) > KEEP_OUTPUTS:
+                outputs.popitem(last=False)
+            return value
+
+    # ----------------------
+    # Stages
+    # ----------------------
+    # (results: snapshot to work on; None = take one now)
+    def bands(
+        self, sweep_param: str, results: List["Result"] | None = None
+    ) -> Tuple[List["Result"], List[Dict[int, Any]]]:
+        """Results along sweep_param (tracking order) and their tracked dips"""
+        results = self.snapshot() if results is None else results
+
+        def build():
+            ordered = order_sweep(results, sweep_param)
+            tracked = track_dips(
+                [r.data for r in ordered], **self.file.dip_settings.kwargs()
+            )
+            return ordered, tracked
+
+        return self._run(
+            "bands", build, sweep_param=sweep_param, results=results
+        )
+
+    def band_matrix(
+        self, sweep_param: str, results: List["Result"] | None = None
+    ) -> Tuple[List["Result"], Dict[str, np.ndarray]]:
+        """Tracked band matrices (see summary_table.band_arrays)"""
+        results = self.snapshot() if results is None else results
+
+        def build():
+            ordered, tracked = self.bands(sweep_param, results)
+            return ordered, band_arrays(tracked)
+
+        return self._run(
+            "figure", build, sweep_param=sweep_param, results=results
+        )
+
+    def band_table(
+        self,
+        sweep_param: str,
+        extra_thresholds: Sequence[float] = (),
+        results: List["Result"] | None = None,
+    ) -> "pd.DataFrame":
+        extra_thresholds = tuple(extra_thresholds)
+        results = self.snapshot() if results is None else results
+
+        def build():
+            ordered, tracked = self.bands(sweep_param, results)
+            return build_band_table(
+                results,
+                sweep_param,
+                dip_settings=self.file.dip_settings,
+                extra_thresholds=extra_thresholds,
+                tracked=tracked,
+                ordered=ordered,
+            )
+
+        return self._run(
+            "band_table", build,
+            sweep_param=sweep_param, extra_thresholds=extra_thresholds,
+            results=results,
+        )
+
+    def summary(
+        self,
+        sweep_param: str,
+        extra_thresholds: Sequence[float] = (),
+        er_base: float = 1.0,
+        results: List["Result"] | None = None,
+    ) -> "pd.DataFrame":
+        """Same table as summary_table.build_summary_table"""
+        extra_thresholds = tuple(extra_thresholds)
+        results = self.snapshot() if results is None else results
+
+        def build():
+            return add_shift_metrics(
+                self.band_table(sweep_param, extra_thresholds, results),
+                sweep_param,
+                er_base,
+            )
+
+        return self._run(
+            "summary", build,
+            sweep_param=sweep_param,
+            extra_thresholds=extra_thresholds,
+            er_base=er_base,
+            results=results,
+        )
@@ -1,6 +1,10 @@
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Mapping, Tuple, Any
 import json
 
+import numpy as np
+
+from .config_table import ConfigTable
+
 
 class Result:
     """
@@ -8,16 +12,27 @@ class Result:
 
     Responsibilities
     ----------------
-    - Hold raw parsed data
+    - Hold raw parsed data (list of points, or an (N, 2) array view
+      into the binary store in large-file mode)
     - Hold band (dip) analysis results
+
+    Parsed results keep config / description in their File's
+    ConfigTable (bind()); standalone results use a private dict.
     """
 
+    __slots__ = (
+        "_config", "_description", "_table", "_row",
+        "data", "bands", "n_bands", "band_valid", "analyzed",
+    )
+
     def __init__(self):
         # ----------------------
         # Raw parsed content
         # ----------------------
-        self.config: Dict[str, float] = {}
-        self.description: List[str] = []
+        self._config: Dict[str, float] | None = {}
+        self._description: List[str] | None = []
+        self._table: ConfigTable | None = None
+        self._row: int = -1
         self.data: List[Tuple[float, float]] = []
 
         # ----------------------
@@ -26,6 +41,47 @@ class Result:
         self.bands: List[Any] = []     # List[Band]
         self.n_bands: int = 0           # number of dips
         self.band_valid: bool = True    # False if extraction failed
+        self.analyzed: bool = False     # True once extraction has run
+
+    # ----------------------
+    # Config / description (shared File-level storage)
+    # ----------------------
+    def bind(self, table: ConfigTable, row: int) -> None:
+        """
+        Move config / description into a File-level ConfigTable row.
+        """
+        self._table = table
+        self._row = row
+        self._config = None
+        self._description = None
+
+    @property
+    def config(self) -> Mapping[str, float]:
+        if self._table is not None:
+            return self._table.view(self._row)
+        return self._config
+
+    @config.setter
+    def config(self, value: Dict[str, float]) -> None:
+        # unbinds from the shared table; the description comes along
+        if self._table is not None:
+            self._description = self._table.description(self._row)
+            self._table = None
+            self._row = -1
+        self._config = value
+
+    @property
+    def description(self) -> List[str]:
+        if self._table is not None:
+            return self._table.description(self._row)
+        return self._description
+
+    @description.setter
+    def description(self, value: List[str]) -> None:
+        if self._table is not None:
+            self._table.set_description(self._row, value)
+        else:
+            self._description = value
 
     # ----------------------
     # Band setters
@@ -36,6 +92,7 @@ class Result:
         """
         self.bands = bands
         self.n_bands = len(bands)
+        self.analyzed = True
 
     def invalidate_bands(self) -> None:
         """
@@ -44,6 +101,7 @@ class Result:
         self.bands = []
         self.n_bands = 0
         self.band_valid = False
+        self.analyzed = True
 
     # ----------------------
     # Accessors (existing)
@@ -51,15 +109,22 @@ class Result:
     def get_description(self) -> List[str]:
         return self.description
 
-    def get_config(self) -> Dict[str, float]:
+    def get_config(self) -> Mapping[str, float]:
         return self.config
 
     def get_config_json(self) -> str:
-        return json.dumps(self.config, indent=2)
+        return json.dumps(dict(self.config), indent=2)
 
     def get_data(self) -> List[Tuple[float, float]]:
         return self.data
 
+    def get_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (freq, s21) as float arrays; views when data is already an array.
+        """
+        arr = np.asarray(self.data, dtype=float).reshape(-1, 2)
+        return arr[:, 0], arr[:, 1]
+
     def count_data(self) -> int:
         return len(self.data)
 
@@ -0,0 +1,168 @@
+from pathlib import Path
+from typing import BinaryIO, Iterator, TextIO
+from contextlib import contextmanager
+from datetime import datetime
+import gzip
+import io
+import shutil
+import zipfile
+
+
+# ============================================================
+# Upload formats
+# ============================================================
+
+# Extensions accepted by the Upload page
+UPLOAD_TYPES = ["txt", "gz", "zst", "zip"]
+
+COMPRESSED_SUFFIXES = (".gz", ".zst", ".zip")
+
+# Plain TXT uploads are gzip-compressed on storage
+STORE_COMPRESSLEVEL = 6
+
+# Streaming copy / decompression chunk
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+def is_compressed(path: Path) -> bool:
+    return path.suffix.lower() in COMPRESSED_SUFFIXES
+
+
+def is_upload(path: Path) -> bool:
+    """
+    True for files the parser can read (plain or compressed TXT).
+    """
+    return path.is_file() and (
+        path.suffix.lower() == ".txt" or is_compressed(path)
+    )
+
+
+def upload_display_name(path: Path) -> str:
+    """
+    'sweep.txt.gz' -> 'sweep.txt' (zip archives keep their name).
+    """
+    if path.suffix.lower() in (".gz", ".zst"):
+        return path.stem
+    return path.name
+
+
+# ============================================================
+# Storage
+# ============================================================
+
+def allocate_run_dir(upload_dir: Path) -> Path:
+    """
+    Create a new, unique run directory under upload_dir.
+
+    Names are timestamps with microseconds (so they still sort by
+    time); exclusive mkdir plus a counter suffix makes concurrent
+    uploads in the same instant get different runs.
+    """
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S_%f")
+    for n in range(1000):
+        run_dir = upload_dir / (stamp if n == 0 else f"{stamp}-{n}")
+        try:
+            run_dir.mkdir()
+        except FileExistsError:
+            continue
+        return run_dir
+    raise RuntimeError(f"Could not allocate a run directory in {upload_dir}")
+
+
+def store_upload(src: BinaryIO, name: str, dest_dir: Path) -> Path:
+    """
+    Stream an uploaded file into dest_dir.
+
+    Compressed uploads are stored as-is; plain TXT is gzip-compressed
+    on the way in. Returns the stored path. A zip archive with more
+    than one export is refused (ValueError) and not kept.
+    """
+    if is_compressed(Path(name)):
+        path = dest_dir / name
+        with path.open("wb") as out:
+            shutil.copyfileobj(src, out, COPY_CHUNK_BYTES)
+        if path.suffix.lower() == ".zip":
+            try:
+                with zipfile.ZipFile(path) as zf:
+                    zip_member(zf, name)
+            except zipfile.BadZipFile as e:
+                path.unlink()
+                raise ValueError(f"Not a zip archive: {name}") from e
+            except ValueError:
+                path.unlink()
+                raise
+        return path
+
+    path = dest_dir / f"{name}.gz"
+    with gzip.open(path, "wb", compresslevel=STORE_COMPRESSLEVEL) as out:
+        shutil.copyfileobj(src, out, COPY_CHUNK_BYTES)
+    return path
+
+
+# ============================================================
+# Reading (streaming decompression)
+# ============================================================
+
+def zip_member(zf: zipfile.ZipFile, name: str) -> str:
+    """
+    The one export inside a zip upload: its only .txt member, or its
+    only member. Archives holding several exports raise ValueError
+    (one File per upload; zip them separately).
+    """
+    members = [m for m in zf.namelist() if not m.endswith("/")]
+    if not members:
+        raise ValueError(f"Empty archive: {name}")
+    txt = [m for m in members if m.lower().endswith(".txt")]
+    if len(txt) == 1:
+        return txt[0]
+    if not txt and len(members) == 1:
+        return members[0]
+    raise ValueError(
+        f"{name} contains {len(txt) or len(members)} files; "
+        "upload one TXT export per archive"
+    )
+
+
+@contextmanager
+def open_text(path: Path) -> Iterator[TextIO]:
+    """
+    Open a plain or compressed TXT export as a text stream.
+
+    Decompression happens on the fly in chunks; no decompressed copy
+    is kept in memory or written to disk.
+    """
+    suffix = path.suffix.lower()
+
+    if suffix == ".gz":
+        with gzip.open(path, "rt", encoding="utf-8", errors="ignore") as f:
+            yield f
+
+    elif suffix == ".zst":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError(
+                "Reading .zst uploads requires the 'zstandard' package"
+            ) from e
+
+        with path.open("rb") as raw:
+            reader = zstandard.ZstdDecompressor().stream_reader(
+                raw, read_size=COPY_CHUNK_BYTES
+            )
+            with io.TextIOWrapper(
+                reader, encoding="utf-8", errors="ignore"
+            ) as f:
+                yield f
+
+    elif suffix == ".zip":
+        with zipfile.ZipFile(path) as zf:
+            with zf.open(zip_member(zf, path.name)) as raw:
+                with io.TextIOWrapper(
+                    raw, encoding="utf-8", errors="ignore"
+                ) as f:
+                    yield f
+
+    else:
+        with path.open("r", encoding="utf-8", errors="ignore") as f:
+            yield f
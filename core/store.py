@@ -0,0 +1,233 @@
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, List, Sequence, Tuple
+from contextlib import contextmanager
+import json
+import re
+import sqlite3
+
+from .file import File
+from .table_view import OPS
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# ============================================================
+# Cross-run analytical store (SQLite)
+# ============================================================
+#
+# Every ingested run is indexed by result config, per-band dip
+# features and per-result summary metrics, so cross-run questions
+# ("er=3 band2_q>200") are answered without re-parsing uploads.
+#
+# Bands are numbered per result (extract_dips order, by frequency),
+# not by the sweep tracking of the summary tables: tracking depends on
+# the chosen sweep parameter, the index does not.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_id   INTEGER PRIMARY KEY,
+    run_id    TEXT NOT NULL,
+    name      TEXT NOT NULL,
+    path      TEXT NOT NULL,
+    UNIQUE (run_id, name)
+);
+CREATE TABLE IF NOT EXISTS results (
+    result_id INTEGER PRIMARY KEY,
+    file_id   INTEGER NOT NULL REFERENCES files(file_id) ON DELETE CASCADE,
+    block     INTEGER NOT NULL,
+    n_points  INTEGER NOT NULL,
+    n_bands   INTEGER NOT NULL,
+    config    TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS params (
+    result_id INTEGER NOT NULL REFERENCES results(result_id) ON DELETE CASCADE,
+    name      TEXT NOT NULL,
+    value     REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bands (
+    result_id INTEGER NOT NULL REFERENCES results(result_id) ON DELETE CASCADE,
+    band      INTEGER NOT NULL,
+    f1        REAL, f0 REAL, f2 REAL,
+    s21       REAL,
+    bw        REAL, q REAL, inv_q REAL,
+    window    REAL,
+    PRIMARY KEY (result_id, band)
+);
+CREATE INDEX IF NOT EXISTS ix_params ON params (name, value, result_id);
+CREATE INDEX IF NOT EXISTS ix_params_result ON params (result_id);
+CREATE INDEX IF NOT EXISTS ix_results_file ON results (file_id);
+"""
+
+# band<i>_<metric> filter columns
+BAND_METRICS = ("f1", "f0", "f2", "s21", "bw", "q", "inv_q", "window")
+RESULT_METRICS = ("n_bands", "n_points")
+
+_BAND_COL = re.compile(r"^band(\d+)_(\w+)$")
+
+
+class ResultStore:
+    """
+    SQLite index of every run's results, dip features and metrics.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as con:
+            con.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        con = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA foreign_keys=ON")
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    # ======================
+    # Ingestion
+    # ======================
+    def ingest(self, run_id: str, files: Iterable[File]) -> None:
+        """
+        Index (or re-index) the given files of a run. Bands are
+        analyzed first if the files have not been analyzed yet.
+        """
+        with self._connect() as con:
+            for f in files:
+                f.analyze_bands_once()
+
+                con.execute(
+                    "DELETE FROM files WHERE run_id = ? AND name = ?",
+                    (run_id, f.display_name),
+                )
+                file_id = con.execute(
+                    "INSERT INTO files (run_id, name, path) VALUES (?, ?, ?)",
+                    (run_id, f.display_name, str(f.path)),
+                ).lastrowid
+
+                for block, r in enumerate(f.results):
+                    result_id = con.execute(
+                        "INSERT INTO results "
+                        "(file_id, block, n_points, n_bands, config) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (file_id, block, r.count_data(), r.n_bands,
+                         json.dumps(dict(r.config))),
+                    ).lastrowid
+
+                    con.executemany(
+                        "INSERT INTO params VALUES (?, ?, ?)",
+                        [(result_id, k, v) for k, v in r.config.items()],
+                    )
+                    con.executemany(
+                        "INSERT INTO bands VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (
+                                result_id, i + 1,
+                                d.f1.f, d.f0.f, d.f2.f, d.f0.s21,
+                                d.bw(), d.q(), d.inv_q(),
+                                r.bands[i + 1].f0.f - d.f0.f
+                                if i + 1 < len(r.bands) else None,
+                            )
+                            for i, d in enumerate(r.bands)
+                        ],
+                    )
+
+    def indexed_runs(self) -> List[str]:
+        with self._connect() as con:
+            rows = con.execute(
+                "SELECT DISTINCT run_id FROM files ORDER BY run_id DESC"
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    # ======================
+    # Query
+    # ======================
+    def query(
+        self,
+        conditions: Sequence[Tuple[str, str, str]],
+        limit: int | None = None,
+    ) -> "pd.DataFrame":
+        """
+        Results across all runs matching every condition.
+
+        Columns: config parameter names, band<i>_<metric>
+        (metric in BAND_METRICS, anything else raises ValueError) or
+        n_bands / n_points.
+        Returns one row per result with its run, file, block, config
+        and the features of all its bands.
+        """
+        import pandas as pd
+
+        where, args = [], []
+        for col, op, val in conditions:
+            if op not in OPS:
+                raise ValueError(f"Invalid operator: {op}")
+            value = float(val)
+
+            m = _BAND_COL.match(col)
+            if m:
+                if m.group(2) not in BAND_METRICS:
+                    raise ValueError(
+                        f"Unknown band metric: {m.group(2)} "
+                        f"(one of {', '.join(BAND_METRICS)})"
+                    )
+                where.append(
+                    "EXISTS (SELECT 1 FROM bands b WHERE "
+                    "b.result_id = r.result_id AND b.band = ? "
+                    f"AND b.{m.group(2)} {op} ?)"
+                )
+                args += [int(m.group(1)), value]
+            elif col in RESULT_METRICS:
+                where.append(f"r.{col} {op} ?")
+                args.append(value)
+            else:
+                where.append(
+                    "EXISTS (SELECT 1 FROM params p WHERE "
+                    "p.result_id = r.result_id AND p.name = ? "
+                    f"AND p.value {op} ?)"
+                )
+                args += [col, value]
+
+        sql = (
+            "SELECT r.result_id, f.run_id, f.name AS file, r.block, "
+            "r.n_points, r.n_bands, r.config "
+            "FROM results r JOIN files f USING (file_id)"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY f.run_id DESC, f.name, r.block"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        with self._connect() as con:
+            hits = pd.read_sql_query(sql, con, params=args)
+            if hits.empty:
+                return hits.drop(columns=["result_id", "config"])
+
+            ids = ",".join(str(i) for i in hits["result_id"])
+            bands = pd.read_sql_query(
+                f"SELECT * FROM bands WHERE result_id IN ({ids})", con
+            )
+
+        # ---- config → columns
+        config = pd.DataFrame(
+            [json.loads(c) for c in hits["config"]], index=hits.index
+        )
+
+        # ---- bands → band<i>_<metric> columns
+        wide = bands.pivot(index="result_id", columns="band")
+        wide.columns = [f"band{b}_{m}" for m, b in wide.columns]
+        wide = wide[sorted(wide.columns, key=_band_sort_key)]
+
+        out = pd.concat([hits.drop(columns="config"), config], axis=1)
+        out = out.merge(wide, left_on="result_id", right_index=True, how="left")
+        return out.drop(columns="result_id")
+
+
+def _band_sort_key(col: str):
+    band, metric = _BAND_COL.match(col).groups()
+    return int(band), BAND_METRICS.index(metric)
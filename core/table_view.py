@@ -0,0 +1,120 @@
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+import operator
+import re
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# ============================================================
+# Filter expressions
+# ============================================================
+#
+# "er=2 band2_q>200 tan_delta<=0.02" -> [(col, op, value), ...]
+
+OPS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">=": operator.ge,
+    "<=": operator.le,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+
+_COND = re.compile(r"^(.+?)(!=|>=|<=|=|>|<)(.+)$")
+
+
+def parse_filter(text: str) -> List[Tuple[str, str, str]]:
+    conditions = []
+    for cond in text.split():
+        m = _COND.match(cond)
+        if not m:
+            raise ValueError(f"Invalid condition: {cond}")
+        col, op, val = (g.strip() for g in m.groups())
+        conditions.append((col, op, val))
+    return conditions
+
+
+def filter_mask(
+    df: "pd.DataFrame",
+    conditions: Sequence[Tuple[str, str, str]],
+) -> "pd.Series":
+    import pandas as pd
+
+    mask = pd.Series(True, index=df.index)
+
+    for col, op, val in conditions:
+        if col not in df.columns:
+            raise ValueError(f"Unknown column: {col}")
+
+        if pd.api.types.is_numeric_dtype(df[col]):
+            mask &= OPS[op](df[col], float(val))
+        elif op in ("=", "!="):
+            mask &= OPS[op](df[col].astype(str), val)
+        else:
+            raise ValueError(f"Operator {op} needs a numeric column: {col}")
+
+    return mask
+
+
+# ============================================================
+# Column projection
+# ============================================================
+
+_BAND = re.compile(r"^(band\d+)_")
+
+
+def column_groups(df: "pd.DataFrame", sweep_param: str) -> Dict[str, List[str]]:
+    """
+    Summary-table columns grouped for projection:
+    one group per band, inter-band windows, and config parameters.
+    """
+    groups: Dict[str, List[str]] = {}
+    for col in df.columns:
+        if col in (sweep_param, "source_file"):
+            continue
+        m = _BAND.match(col)
+        if m:
+            key = m.group(1)
+        elif col.startswith("window_"):
+            key = "windows"
+        else:
+            key = "parameters"
+        groups.setdefault(key, []).append(col)
+    return groups
+
+
+# ============================================================
+# Query (filter → sort → project → page)
+# ============================================================
+
+def query_table(
+    df: "pd.DataFrame",
+    conditions: Sequence[Tuple[str, str, str]] = (),
+    sort_by: str | None = None,
+    ascending: bool = True,
+    columns: Sequence[str] | None = None,
+    page: int = 1,
+    page_size: int = 50,
+) -> Tuple["pd.DataFrame", int]:
+    """
+    Run filter / sort / projection / paging on the server and return
+    only the visible page, plus the total number of matching rows.
+    """
+    view = df
+    if conditions:
+        view = view[filter_mask(view, conditions)]
+
+    if sort_by is not None:
+        if sort_by not in view.columns:
+            raise ValueError(f"Unknown column: {sort_by}")
+        view = view.sort_values(sort_by, ascending=ascending, kind="stable")
+
+    total = len(view)
+    start = max(page - 1, 0) * page_size
+    view = view.iloc[start:start + page_size]
+
+    if columns is not None:
+        view = view[list(columns)]
+
+    return view, total
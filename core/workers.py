@@ -0,0 +1,208 @@
+from collections import OrderedDict, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Callable, Deque, Dict, List, Tuple
+import os
+import threading
+
+
+# ============================================================
+# Limits
+# ============================================================
+
+# Jobs queued or running across all sessions; a session is refused
+# only when the other sessions' jobs fill this
+MAX_PENDING = 64
+
+# Jobs queued or running for one session; further jobs of the session
+# wait in its backlog and are queued as its jobs finish
+SESSION_MAX_PENDING = 16
+
+
+class PoolBusy(RuntimeError):
+    """Raised by WorkerPool.submit when a queue limit is reached"""
+
+
+_Job = Tuple[Future, Callable[..., Any], tuple, dict]
+
+
+# ============================================================
+# Shared worker pool
+# ============================================================
+
+class WorkerPool:
+    """
+    Fixed set of worker threads shared by every session of the server.
+
+    - at most `workers` heavy jobs run at once (parsing, band analysis,
+      summary tables), whatever the number of sessions
+    - queued jobs are taken round-robin across sessions, so one session
+      uploading many files does not starve the others
+    - a session has at most session_max_pending jobs queued; the rest
+      of a large batch waits in the session's backlog (never refused)
+    - submit() raises PoolBusy when other sessions fill the queue
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        max_pending: int = MAX_PENDING,
+        session_max_pending: int = SESSION_MAX_PENDING,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.session_max_pending = session_max_pending
+
+        self._cv = threading.Condition()
+        self._queues: "OrderedDict[str, Deque[_Job]]" = OrderedDict()
+        self._pending: Dict[str, int] = {}
+        self._held: Dict[str, Deque[_Job]] = {}
+        self._running = 0
+
+        self._threads: List[threading.Thread] = [
+            threading.Thread(
+                target=self._work, name=f"le701-worker-{i}", daemon=True
+            )
+            for i in range(self.workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    # ----------------------
+    # Submitting
+    # ----------------------
+    def submit(
+        self, session: str, fn: Callable[..., Any], *args, **kwargs
+    ) -> Future:
+        return self._submit_all(session, [(fn, args, kwargs)])[0]
+
+    def submit_map(
+        self, session: str, fn: Callable[..., Any], *iterables, **kwargs
+    ) -> List[Future]:
+        """
+        submit() fn for each item (zipped, like map()). The batch is
+        accepted or refused as a whole, whatever its size.
+        """
+        return self._submit_all(
+            session, [(fn, args, kwargs) for args in zip(*iterables)]
+        )
+
+    def _submit_all(
+        self, session: str, calls: List[Tuple[Callable[..., Any], tuple, dict]]
+    ) -> List[Future]:
+        futures: List[Future] = []
+        with self._cv:
+            others = sum(
+                n for s, n in self._pending.items() if s != session
+            )
+            if others >= self.max_pending:
+                raise PoolBusy(
+                    f"Server busy: {others} jobs pending, try again shortly"
+                )
+            for fn, args, kwargs in calls:
+                future: Future = Future()
+                self._enqueue(session, (future, fn, args, kwargs))
+                futures.append(future)
+        return futures
+
+    def _enqueue(self, session: str, job: _Job) -> None:
+        """Queue a job, or hold it back while the session is at its cap"""
+        mine = self._pending.get(session, 0)
+        if mine >= self.session_max_pending:
+            self._held.setdefault(session, deque()).append(job)
+            return
+        self._queues.setdefault(session, deque()).append(job)
+        self._pending[session] = mine + 1
+        self._cv.notify()
+
+    def run(self, session: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """submit() and wait for the result"""
+        return self.submit(session, fn, *args, **kwargs).result()
+
+    # ----------------------
+    # Workers
+    # ----------------------
+    def _next(self) -> Tuple[str, _Job]:
+        """Oldest job of the session at the head of the rotation"""
+        session, queue = next(iter(self._queues.items()))
+        job = queue.popleft()
+        if queue:
+            self._queues.move_to_end(session)
+        else:
+            del self._queues[session]
+        return session, job
+
+    def _work(self) -> None:
+        while True:
+            with self._cv:
+                while not self._queues:
+                    self._cv.wait()
+                session, (future, fn, args, kwargs) = self._next()
+                self._running += 1
+
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args, **kwargs))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self._cv:
+                    self._running -= 1
+                    self._pending[session] -= 1
+                    held = self._held.get(session)
+                    if held:
+                        job = held.popleft()
+                        if not held:
+                            del self._held[session]
+                        self._enqueue(session, job)
+                    elif not self._pending[session]:
+                        del self._pending[session]
+
+    # ----------------------
+    # Introspection
+    # ----------------------
+    def stats(self) -> Dict[str, int]:
+        with self._cv:
+            return {
+                "workers": self.workers,
+                "running": self._running,
+                "queued": sum(len(q) for q in self._queues.values()),
+                "held": sum(len(q) for q in self._held.values()),
+                "sessions": len(self._pending),
+            }
+
+
+def wait(
+    future: Future,
+    on_tick: Callable[[], None],
+    interval: float,
+) -> Any:
+    """
+    Wait for a pool job, calling on_tick every `interval` seconds
+    (e.g. to redraw progress) and once more at the end.
+    """
+    while True:
+        try:
+            result = future.result(timeout=interval)
+        except FutureTimeout:
+            on_tick()
+            continue
+        on_tick()
+        return result
+
+
+# ============================================================
+# Process-wide instance
+# ============================================================
+
+_pool: WorkerPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> WorkerPool:
+    """The pool shared by all sessions (created on first use)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool()
+        return _pool
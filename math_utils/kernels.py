@@ -0,0 +1,214 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+
+# ============================================================
+# Dip-extraction kernels
+# ============================================================
+#
+# Two interchangeable backends behind one interface:
+#   - "numba": JIT-compiled loops (only if numba is installed)
+#   - "numpy": vectorized NumPy fallback
+#
+# Both return identical results; extract_dips picks one through
+# get_backend().
+
+@dataclass(frozen=True)
+class Backend:
+    name: str
+
+    # s21 -> indices i with s21[i] < both neighbours (ascending)
+    local_minima: Callable[[np.ndarray], np.ndarray]
+
+    # (s21, idx[m], levels[m, k]) -> (left[m, k], right[m, k])
+    #   left:  last i < idx with s21[i] > level >= s21[i + 1]
+    #   right: first i > idx with s21[i] > level >= s21[i - 1]
+    #   -1 where no crossing exists
+    crossings: Callable[
+        [np.ndarray, np.ndarray, np.ndarray],
+        Tuple[np.ndarray, np.ndarray]
+    ]
+
+    # (freq, s21, idx[m]) -> parabolic (f_min[m], s_min[m])
+    refine: Callable[
+        [np.ndarray, np.ndarray, np.ndarray],
+        Tuple[np.ndarray, np.ndarray]
+    ]
+
+    # (freq, s21, centers[m] GHz, window) -> idx[m]: lowest sample
+    #   within ±window samples of each center, -1 where that sample
+    #   is not a local minimum (the dip left its window)
+    near_minima: Callable[
+        [np.ndarray, np.ndarray, np.ndarray, int],
+        np.ndarray
+    ]
+
+
+# Samples an outward crossing search walks before checking whether
+# any crossing is still reachable (numba backend)
+FAR_WALK = 64
+
+
+# ============================================================
+# NumPy backend
+# ============================================================
+
+def _np_local_minima(s21: np.ndarray) -> np.ndarray:
+    inner = s21[1:-1]
+    return np.flatnonzero((inner < s21[:-2]) & (inner < s21[2:])) + 1
+
+
+def _np_crossings(s21, idx, levels):
+    n = len(s21)
+    m, k = levels.shape
+    left = np.full((m, k), -1, dtype=np.int64)
+    right = np.full((m, k), -1, dtype=np.int64)
+
+    # ---- highest sample at or before / at or after each index: a
+    # side with nothing above the level has no crossing to search for
+    head_max = np.maximum.accumulate(s21)
+    tail_max = np.maximum.accumulate(s21[::-1])[::-1]
+
+    for d in range(m):
+        c = int(idx[d])
+        head = s21[:c + 1]
+        tail = s21[c:]
+        for j in range(k):
+            level = levels[d, j]
+
+            if c > 0 and head_max[c - 1] > level:
+                down = np.flatnonzero((head[:-1] > level) & (head[1:] <= level))
+                if len(down):
+                    left[d, j] = down[-1]
+
+            if c < n - 1 and tail_max[c + 1] > level:
+                up = np.flatnonzero((tail[1:] > level) & (tail[:-1] <= level))
+                if len(up):
+                    right[d, j] = c + 1 + up[0]
+
+    return left, right
+
+
+def _np_refine(freq, s21, idx):
+    idx = np.asarray(idx, dtype=np.int64)
+    f_min = freq[idx].astype(float)
+    s_min = s21[idx].astype(float)
+
+    inner = (idx > 0) & (idx < len(freq) - 1)
+    i = idx[inner]
+    if not len(i):
+        return f_min, s_min
+
+    f2, f3 = freq[i], freq[i + 1]
+    s1, s2, s3 = s21[i - 1], s21[i], s21[i + 1]
+
+    denom = (s1 - 2 * s2 + s3)
+    ok = denom != 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = (s1 - s3) / (2 * denom)
+        f_fit = f2 + delta * (f3 - f2)
+        s_fit = s2 - 0.25 * (s1 - s3) * delta
+
+    f_min[inner] = np.where(ok, f_fit, f2)
+    s_min[inner] = np.where(ok, s_fit, s2)
+    return f_min, s_min
+
+
+def _np_near_minima(freq, s21, centers, window):
+    n = len(s21)
+    out = np.full(len(centers), -1, dtype=np.int64)
+    for d, c in enumerate(np.searchsorted(freq, centers).tolist()):
+        lo, hi = max(c - window, 1), min(c + window + 1, n - 1)
+        if lo >= hi:
+            continue
+        i = lo + int(s21[lo:hi].argmin())
+        if s21[i] < s21[i - 1] and s21[i] < s21[i + 1]:
+            out[d] = i
+    return out
+
+
+NUMPY = Backend(
+    name="numpy",
+    local_minima=_np_local_minima,
+    crossings=_np_crossings,
+    refine=_np_refine,
+    near_minima=_np_near_minima,
+)
+
+
+# ============================================================
+# Numba backend (optional)
+# ============================================================
+
+def _build_numba() -> Backend | None:
+    try:
+        from math_utils import numba_kernels as nb
+    except ImportError:
+        return None
+
+    return Backend(
+        name="numba",
+        local_minima=nb.local_minima,
+        crossings=nb.crossings,
+        refine=nb.refine,
+        near_minima=nb.near_minima,
+    )
+
+
+# ============================================================
+# Backend selection
+# ============================================================
+
+# numba is imported (and its kernels built) on first use, not at
+# import time: it is the slowest import in the app.
+
+BACKENDS: Dict[str, Backend] = {"numpy": NUMPY}
+
+_numba_loaded = False
+_active: Backend | None = None      # None = "auto"
+
+
+def _load_numba() -> None:
+    global _numba_loaded
+    if _numba_loaded:
+        return
+    _numba_loaded = True
+    backend = _build_numba()
+    if backend is not None:
+        BACKENDS["numba"] = backend
+
+
+def available() -> List[str]:
+    _load_numba()
+    return list(BACKENDS)
+
+
+def set_backend(name: str) -> None:
+    """
+    Select the default backend: "auto", "numba" or "numpy".
+    """
+    global _active
+    _active = None if name == "auto" else get_backend(name)
+
+
+def get_backend(name: str | None = None) -> Backend:
+    """
+    Resolve a backend name (None = current default).
+    """
+    if name is None:
+        if _active is not None:
+            return _active
+        name = "auto"
+    if name == "numpy":
+        return NUMPY
+
+    _load_numba()
+    if name == "auto":
+        return BACKENDS.get("numba", NUMPY)
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown or unavailable dip backend: {name} "
+            f"(available: {', '.join(BACKENDS)})"
+        )
+    return BACKENDS[name]
@@ -0,0 +1,145 @@
+"""
+Numba backend of math_utils.kernels.
+
+Imported by kernels on first use (numba is the slowest import in the
+app). The kernels are module-level so numba's on-disk cache can find
+them again: a kernel that captured another kernel in a closure would
+get a new cache key in every process and be recompiled each time.
+"""
+import numba
+import numpy as np
+
+from math_utils.kernels import FAR_WALK
+
+
+@numba.njit(cache=True)
+def local_minima(s21):
+    n = len(s21)
+    out = np.empty(max(n - 2, 0), dtype=np.int64)
+    k = 0
+    for i in range(1, n - 1):
+        if s21[i] < s21[i - 1] and s21[i] < s21[i + 1]:
+            out[k] = i
+            k += 1
+    return out[:k]
+
+
+@numba.njit(cache=True)
+def walk(s21, levels, out, i, stop, step, todo):
+    # out[j] = first i (from i towards stop, exclusive) with
+    # s21[i] > levels[j] >= s21[i - step]; (lo, hi) rejects
+    # samples that cannot cross any level
+    lo = levels.min()
+    hi = levels.max()
+    while i != stop and todo:
+        if s21[i] > lo and s21[i - step] <= hi:
+            for j in range(len(levels)):
+                if (out[j] == -1 and s21[i] > levels[j]
+                        and s21[i - step] <= levels[j]):
+                    out[j] = i
+                    todo -= 1
+        i += step
+    return i, todo
+
+
+@numba.njit(cache=True)
+def running_max(s21, step):
+    n = len(s21)
+    out = np.empty(n)
+    i = 0 if step > 0 else n - 1
+    out[i] = s21[i]
+    for _ in range(n - 1):
+        i += step
+        out[i] = max(out[i - step], s21[i])
+    return out
+
+
+@numba.njit(cache=True)
+def crossings(s21, idx, levels):
+    n = len(s21)
+    m, k = levels.shape
+    left = np.full((m, k), -1, dtype=np.int64)
+    right = np.full((m, k), -1, dtype=np.int64)
+
+    # ---- highest sample at or before / at or after each index,
+    # built on the first long walk only: past FAR_WALK samples,
+    # levels that nothing further out rises above are dropped (-2)
+    # instead of walked to the end of the trace (noise minima)
+    head_max = np.empty(0)
+    tail_max = np.empty(0)
+
+    for d in range(m):
+        c = idx[d]
+
+        # ---- one outward sweep per side, all levels at once
+        i, todo = walk(s21, levels[d], left[d], c - 1,
+                       max(c - 1 - FAR_WALK, -1), -1, k)
+        if todo and i >= 0:
+            if not len(head_max):
+                head_max = running_max(s21, 1)
+            for j in range(k):
+                if left[d, j] == -1 and head_max[i] <= levels[d, j]:
+                    left[d, j] = -2
+                    todo -= 1
+            walk(s21, levels[d], left[d], i, -1, -1, todo)
+
+        i, todo = walk(s21, levels[d], right[d], c + 1,
+                       min(c + 1 + FAR_WALK, n), 1, k)
+        if todo and i < n:
+            if not len(tail_max):
+                tail_max = running_max(s21, -1)
+            for j in range(k):
+                if right[d, j] == -1 and tail_max[i] <= levels[d, j]:
+                    right[d, j] = -2
+                    todo -= 1
+            walk(s21, levels[d], right[d], i, n, 1, todo)
+
+    for d in range(m):
+        for j in range(k):
+            left[d, j] = max(left[d, j], -1)
+            right[d, j] = max(right[d, j], -1)
+
+    return left, right
+
+
+@numba.njit(cache=True)
+def refine(freq, s21, idx):
+    m = len(idx)
+    f_min = np.empty(m)
+    s_min = np.empty(m)
+    for d in range(m):
+        i = idx[d]
+        f_min[d] = freq[i]
+        s_min[d] = s21[i]
+        if i <= 0 or i >= len(freq) - 1:
+            continue
+
+        s1, s2, s3 = s21[i - 1], s21[i], s21[i + 1]
+        denom = (s1 - 2 * s2 + s3)
+        if denom == 0:
+            continue
+
+        delta = (s1 - s3) / (2 * denom)
+        f_min[d] = freq[i] + delta * (freq[i + 1] - freq[i])
+        s_min[d] = s2 - 0.25 * (s1 - s3) * delta
+    return f_min, s_min
+
+
+@numba.njit(cache=True)
+def near_minima(freq, s21, centers, window):
+    n = len(s21)
+    m = len(centers)
+    out = np.full(m, -1, dtype=np.int64)
+    for d in range(m):
+        c = np.searchsorted(freq, centers[d])
+        lo = max(c - window, 1)
+        hi = min(c + window + 1, n - 1)
+        if lo >= hi:
+            continue
+        i = lo
+        for j in range(lo + 1, hi):
+            if s21[j] < s21[i]:
+                i = j
+        if s21[i] < s21[i - 1] and s21[i] < s21[i + 1]:
+            out[d] = i
+    return out
@@ -0,0 +1,21 @@
+"""
+Entry module of the combined-table worker processes.
+
+summary_table.process_pool() preloads it into the forkserver, so every
+worker forked from there starts with it imported. A new worker would
+otherwise re-run the parent's __main__ first; under Streamlit that is
+whichever page script happens to be running, and it must not run in a
+worker. Workers only run summary_table jobs, so they skip that step.
+
+Import it in the forkserver only (it changes how this process starts
+its own children).
+"""
+from multiprocessing import spawn
+
+
+def _keep_main(_) -> None:
+    """Workers keep the forkserver's (empty) __main__"""
+
+
+spawn._fixup_main_from_path = _keep_main
+spawn._fixup_main_from_name = _keep_main
@@ -1,3 +1,7 @@
+from dataclasses import dataclass
+
+import numpy as np
+
 from math_utils.signal_feature import Dip
 
 
@@ -37,3 +41,79 @@ def sensitivity(
         return sen / f0_base
 
     return sen
+
+
+# ============================================================
+# Trend fitting (whole sweeps, vectorized)
+# ============================================================
+
+@dataclass(frozen=True)
+class TrendFit:
+    """
+    Least-squares lines y = slope * x + intercept, one per column
+    (e.g. per band and file). Columns with fewer than 2 points or a
+    constant x are NaN.
+    """
+    slope: np.ndarray
+    intercept: np.ndarray
+    r2: np.ndarray
+    n: np.ndarray
+
+    def at(self, x: float) -> np.ndarray:
+        return self.intercept + self.slope * x
+
+    def sensitivity(self, x_base: float = 1.0) -> np.ndarray:
+        """
+        Fitted counterpart of sensitivity(norm=True):
+        |slope| * 100 / y(x_base)
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.abs(self.slope) * 100 / self.at(x_base)
+
+
+def fit_trends(x: np.ndarray, y: np.ndarray) -> TrendFit:
+    """
+    Fit every column of y (n, m) against x ((n,) or (n, m)) at once.
+    NaN in x or y drops that point from its column only; with no rows
+    every fit is NaN.
+    """
+    y = np.asarray(y, dtype=float)
+    if y.ndim == 1:
+        y = y[:, None]
+    x = np.asarray(x, dtype=float)
+    if x.ndim == 1:
+        x = x[:, None]
+    x = np.broadcast_to(x, y.shape)
+
+    if not len(y):
+        m = y.shape[1]
+        return TrendFit(
+            slope=np.full(m, np.nan),
+            intercept=np.full(m, np.nan),
+            r2=np.full(m, np.nan),
+            n=np.zeros(m, dtype=int),
+        )
+
+    w = np.isfinite(x) & np.isfinite(y)
+    xw = np.where(w, x, 0.0)
+    yw = np.where(w, y, 0.0)
+    n = w.sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mx = xw.sum(axis=0) / n
+        my = yw.sum(axis=0) / n
+        dx = np.where(w, x - mx, 0.0)
+        dy = np.where(w, y - my, 0.0)
+
+        sxx = (dx * dx).sum(axis=0)
+        syy = (dy * dy).sum(axis=0)
+        sxy = (dx * dy).sum(axis=0)
+
+        ok = (n >= 2) & (sxx > 0)
+        slope = np.where(ok, sxy / sxx, np.nan)
+        intercept = np.where(ok, my - slope * mx, np.nan)
+        r2 = np.where(
+            ok, np.where(syy > 0, sxy * sxy / (sxx * syy), 1.0), np.nan
+        )
+
+    return TrendFit(slope=slope, intercept=intercept, r2=r2, n=n)
@@ -1,6 +1,20 @@
 import numpy as np
-from dataclasses import dataclass
-from typing import List, Tuple
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Sequence, Tuple
+import math
+
+from math_utils.kernels import Backend, get_backend
+
+
+# Warm-start search half-window (samples) around the previous f0
+TRACK_WINDOW = 8
+
+# Tracking: steps between full rescans (catches dips appearing away
+# from the span edges)
+REFRESH_STEPS = 16
+
+# Prominence prefilter: samples searched on each side of a candidate
+PROMINENCE_WINDOW = 50
 
 
 # ============================================================
@@ -29,27 +43,33 @@ class Dip:
         return 1.0 / self.q()
 
 
-# ============================================================
-# Internal helpers
-# ============================================================
-
-def _refine_minimum(freq, s21, idx) -> Point:
-    """Parabolic interpolation for f0"""
-    if idx <= 0 or idx >= len(freq) - 1:
-        return Point(freq[idx], s21[idx])
+@dataclass(frozen=True)
+class DipSettings:
+    """extract_dips keyword arguments, as one hashable value"""
+    threshold_db: float = 3.0
+    min_spacing: int = 3
+    min_prominence_db: float = 0.0
+    smooth: int = 0
 
-    f1, f2, f3 = freq[idx - 1], freq[idx], freq[idx + 1]
-    s1, s2, s3 = s21[idx - 1], s21[idx], s21[idx + 1]
+    def kwargs(self) -> dict:
+        return asdict(self)
 
-    denom = (s1 - 2 * s2 + s3)
-    if denom == 0:
-        return Point(f2, s2)
 
-    delta = (s1 - s3) / (2 * denom)
-    f_min = f2 + delta * (f3 - f2)
-    s_min = s2 - 0.25 * (s1 - s3) * delta
+# ============================================================
+# Internal helpers
+# ============================================================
 
-    return Point(f_min, s_min)
+def _as_arrays(
+    data_points, contiguous: bool = True
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Contiguous (freq, s21) float arrays from points or an (N, 2) array;
+    column views (no copy) with contiguous=False.
+    """
+    arr = np.asarray(data_points, dtype=float).reshape(-1, 2)
+    if not contiguous:
+        return arr[:, 0], arr[:, 1]
+    return np.ascontiguousarray(arr[:, 0]), np.ascontiguousarray(arr[:, 1])
 
 
 def _interp_point(f1, s1, f2, s2, level) -> Point:
@@ -59,40 +79,148 @@ def _interp_point(f1, s1, f2, s2, level) -> Point:
     return Point(f, level)
 
 
-def _find_3db_dip(freq, s21, idx, threshold_db=3.0) -> Dip:
-    # ---- refined frequency minimum
-    p0 = _refine_minimum(freq, s21, idx)
-
-    # ---- 3-dB level from RAW data (Excel reference)
-    level = s21[idx] + threshold_db
+def _dips_at(
+    freq: np.ndarray,
+    s21: np.ndarray,
+    idx: Sequence[int],
+    threshold_db: float,
+    kernels: Backend,
+) -> List[Dip | None]:
+    """
+    3-dB dips around the given minima (None where a crossing is
+    missing): parabolic f0, 3-dB level from RAW data (Excel reference).
+    """
+    return [
+        row[0] for row in
+        _dips_multi(freq, s21, idx, [threshold_db], kernels)
+    ]
 
-    # ---- left crossing
-    p1 = None
-    for i in range(idx - 1, -1, -1):
-        if s21[i] > level and s21[i + 1] <= level:
-            p1 = _interp_point(
-                freq[i], s21[i],
-                freq[i + 1], s21[i + 1],
-                level
-            )
-            break
 
-    # ---- right crossing
-    p2 = None
-    for i in range(idx + 1, len(freq)):
-        if s21[i] > level and s21[i - 1] <= level:
-            p2 = _interp_point(
-                freq[i - 1], s21[i - 1],
-                freq[i], s21[i],
-                level
-            )
-            break
+def _dips_multi(
+    freq: np.ndarray,
+    s21: np.ndarray,
+    idx: Sequence[int],
+    thresholds: Sequence[float],
+    kernels: Backend,
+) -> List[List[Dip | None]]:
+    """
+    One Dip per (minimum, threshold), sharing the refined f0; all
+    threshold crossings come from a single outward sweep per minimum.
+    """
+    idx = np.asarray(idx, dtype=np.int64)
+    if not len(idx):
+        return []
 
-    if p1 is None or p2 is None:
+    levels = s21[idx][:, None] + np.asarray(thresholds, dtype=float)[None, :]
+    left, right = kernels.crossings(s21, idx, levels)
+    f_min, s_min = kernels.refine(freq, s21, idx)
+
+    rows: List[List[Dip | None]] = []
+    for d, (lefts, rights) in enumerate(zip(left.tolist(), right.tolist())):
+        p0 = None
+        row: List[Dip | None] = []
+        for t, (i, j) in enumerate(zip(lefts, rights)):
+            if i < 0 or j < 0:
+                row.append(None)
+                continue
+            if p0 is None:
+                p0 = Point(f_min[d], s_min[d])
+
+            level = levels[d, t]
+            row.append(Dip(
+                f1=_interp_point(freq[i], s21[i], freq[i + 1], s21[i + 1], level),
+                f0=p0,
+                f2=_interp_point(freq[j - 1], s21[j - 1], freq[j], s21[j], level),
+            ))
+        rows.append(row)
+    return rows
+
+
+def _find_3db_dip(freq, s21, idx, threshold_db=3.0, kernels=None) -> Dip:
+    dip = _dips_at(freq, s21, [idx], threshold_db, kernels or get_backend())[0]
+    if dip is None:
         raise ValueError("3-dB crossings not found")
+    return dip
+
+
+def _smooth(s21: np.ndarray, width: int) -> np.ndarray:
+    """Centered moving average (edge-padded), width in samples"""
+    half = width // 2
+    padded = np.pad(s21, half, mode="edge")
+    kernel = np.full(2 * half + 1, 1.0 / (2 * half + 1))
+    return np.convolve(padded, kernel, mode="valid")
+
+
+def _prominence(s21: np.ndarray, idx: np.ndarray, window: int) -> np.ndarray:
+    """
+    Local prominence (dB) of minima at idx: the lower of the highest
+    levels within ±window samples on either side, minus the minimum.
+    """
+    padded = np.pad(s21, window, mode="edge")
+    views = np.lib.stride_tricks.sliding_window_view(padded, 2 * window + 1)
+    rows = views[idx]
+    left = rows[:, :window].max(axis=1)
+    right = rows[:, window + 1:].max(axis=1)
+    return np.minimum(left, right) - s21[idx]
+
+
+def _snap_to_raw(s21: np.ndarray, idx: np.ndarray, half: int) -> np.ndarray:
+    """Move smoothed-trace minima to the raw minimum within ±half"""
+    padded = np.pad(s21, half, mode="constant", constant_values=np.inf)
+    views = np.lib.stride_tricks.sliding_window_view(padded, 2 * half + 1)
+    return np.unique(idx + views[idx].argmin(axis=1) - half)
+
+
+def _candidates(
+    s21: np.ndarray,
+    min_prominence_db: float = 0.0,
+    smooth: int = 0,
+    prominence_window: int = PROMINENCE_WINDOW,
+    kernels: Backend | None = None,
+) -> np.ndarray:
+    """
+    Local-minimum candidates in one vectorized pass, optionally on a
+    smoothed trace and pruned by prominence. Indices refer to the raw
+    trace, in ascending order.
+    """
+    s = _smooth(s21, smooth) if smooth > 1 else s21
+
+    idx = (kernels or get_backend()).local_minima(s)
+
+    if min_prominence_db > 0 and len(idx):
+        idx = idx[_prominence(s, idx, prominence_window) >= min_prominence_db]
+
+    if smooth > 1 and len(idx):
+        idx = _snap_to_raw(s21, idx, smooth // 2)
+        idx = idx[(idx > 0) & (idx < len(s21) - 1)]
+
+    return idx
+
+
+def _select(
+    s21: np.ndarray,
+    min_spacing: int,
+    min_prominence_db: float,
+    smooth: int,
+    kernels: Backend,
+) -> List[int]:
+    """Candidate minima, deepest first, at least min_spacing apart"""
+    candidates = _candidates(
+        s21, min_prominence_db, smooth, kernels=kernels
+    )
+
+    # ---- sort by depth (deepest first)
+    candidates = candidates[np.argsort(s21[candidates], kind="stable")]
 
-    return Dip(f1=p1, f0=p0, f2=p2)
+    # ---- remove duplicates that are too close
+    selected = []
+    blocked = np.zeros(len(s21) + 2 * min_spacing, dtype=bool)
+    for idx in candidates.tolist():
+        if not blocked[idx + min_spacing]:
+            selected.append(idx)
+            blocked[idx + 1:idx + 2 * min_spacing] = True
 
+    return selected
 
 
 # ============================================================
@@ -100,44 +228,300 @@ def _find_3db_dip(freq, s21, idx, threshold_db=3.0) -> Dip:
 # ============================================================
 
 def extract_dips(
-    data_points: List[Tuple[float, float]],
+    data_points: List[Tuple[float, float]] | np.ndarray,
     threshold_db: float = 3.0,
     min_spacing: int = 3,
+    min_prominence_db: float = 0.0,
+    smooth: int = 0,
+    backend: str | None = None,
 ) -> List[Dip]:
     """
     Extract ALL resonance dips automatically (n-band),
     Excel / LE701 compatible.
+
+    backend selects the kernel implementation ("numba", "numpy";
+    None = math_utils.kernels default).
+
+    For noisy measured traces, min_prominence_db drops minima that do
+    not stand out from their surroundings, and smooth (samples) runs
+    the minimum search on a moving average. Both only prune candidates;
+    the 3-dB search still runs on the raw trace.
     """
-    freq = np.array([p[0] for p in data_points], dtype=float)
-    s21 = np.array([p[1] for p in data_points], dtype=float)
+    kernels = get_backend(backend)
+    freq, s21 = _as_arrays(data_points)
+
+    selected = _select(
+        s21, min_spacing, min_prominence_db, smooth, kernels
+    )
 
-    # ---- find all local minima
-    candidates = [
-        i for i in range(1, len(s21) - 1)
-        if s21[i] < s21[i - 1] and s21[i] < s21[i + 1]
+    dips = [
+        d for d in _dips_at(freq, s21, selected, threshold_db, kernels)
+        if d is not None
     ]
 
-    if not candidates:
+    # ---- order by frequency (low → high)
+    dips.sort(key=lambda d: d.f0.f)
+
+    return dips
+
+
+def band_widths(
+    data_points: List[Tuple[float, float]] | np.ndarray,
+    dips: Sequence[Dip],
+    thresholds: Sequence[float],
+    backend: str | None = None,
+) -> List[Dict[float, Dip | None]]:
+    """
+    Widths of already-extracted dips at extra thresholds, without
+    re-running minima detection (e.g. for tracked sweep bands).
+    """
+    freq, s21 = _as_arrays(data_points)
+    if not len(dips):
         return []
 
-    # ---- sort by depth (deepest first)
-    candidates.sort(key=lambda i: s21[i])
+    # ---- raw minimum = sample nearest to the refined f0
+    f0 = np.array([d.f0.f for d in dips])
+    c = np.clip(np.searchsorted(freq, f0), 1, len(freq) - 1)
+    idx = np.where(f0 - freq[c - 1] < freq[c] - f0, c - 1, c)
 
-    # ---- remove duplicates that are too close
-    selected = []
-    for idx in candidates:
-        if all(abs(idx - j) >= min_spacing for j in selected):
-            selected.append(idx)
+    rows = _dips_multi(freq, s21, idx, thresholds, get_backend(backend))
+    return [dict(zip(thresholds, row)) for row in rows]
+
+
+# ============================================================
+# Sweep-aware extraction (warm-started tracking)
+# ============================================================
+
+def extract_dips_near(
+    data_points: List[Tuple[float, float]] | np.ndarray,
+    centers: Sequence[float],
+    threshold_db: float = 3.0,
+    window: int = TRACK_WINDOW,
+    backend: str | None = None,
+) -> List[Dip] | None:
+    """
+    Warm-started search: look for one dip within ±window samples of
+    each expected f0 (GHz) instead of scanning the whole trace.
 
-    dips: List[Dip] = []
-    for idx in selected:
-        try:
-            dip = _find_3db_dip(freq, s21, idx, threshold_db)
-            dips.append(dip)
-        except ValueError:
+    Returns dips in the same order as `centers`, or None when
+    tracking fails (dip left its window, merged, or lost its crossings).
+    """
+    freq, s21 = _as_arrays(data_points)
+    near = _near(freq, s21, centers, threshold_db, window, get_backend(backend))
+    return None if near is None else near[0]
+
+
+def _near(
+    freq: np.ndarray,
+    s21: np.ndarray,
+    centers: Sequence[float],
+    threshold_db: float,
+    window: int,
+    kernels: Backend,
+) -> Tuple[List[Dip], List[int]] | None:
+    """extract_dips_near on arrays; also returns the minima indices"""
+    idx = kernels.near_minima(
+        freq, s21, np.asarray(centers, dtype=float), window
+    )
+    found = idx.tolist()
+    if not found or min(found) < 0 or len(set(found)) < len(found):
+        return None         # a dip left its window, or two dips merged
+
+    dips = _dips_at(freq, s21, found, threshold_db, kernels)
+    if any(d is None for d in dips):
+        return None
+    return dips, found
+
+
+def _entering(
+    freq: np.ndarray,
+    s21: np.ndarray,
+    tracked: Sequence[int],
+    reach: float,
+    window: int,
+    threshold_db: float,
+    min_prominence_db: float,
+    smooth: int,
+    kernels: Backend,
+) -> bool:
+    """
+    True if either end of the span holds a dip that is not one of the
+    tracked minima (a resonance moving into the span). Each edge strip
+    is window samples plus reach × the edge frequency wide.
+    """
+    n = len(s21)
+    df = float(freq[-1] - freq[0]) / max(n - 1, 1)
+    if df <= 0:
+        return False
+
+    width = [
+        window + math.ceil(reach * abs(float(f)) / df)
+        for f in (freq[0], freq[-1])
+    ]
+    for lo, hi in ((0, min(width[0], n)), (max(n - width[1], 0), n)):
+        strip = s21[lo:hi]
+        if not len(kernels.local_minima(strip)):
+            continue            # monotone: no dip
+        if strip.max() - strip.min() < threshold_db:
+            continue            # too flat to hold a dip
+        idx = lo + _candidates(
+            strip, min_prominence_db, smooth, kernels=kernels
+        )
+        idx = [
+            i for i in idx.tolist()
+            if all(abs(i - t) > 2 * window for t in tracked)
+        ]
+        if idx and any(
+            d is not None
+            for d in _dips_at(freq, s21, idx, threshold_db, kernels)
+        ):
+            return True
+    return False
+
+
+def _match_tracks(
+    dips: List[Dip],
+    prev: Dict[int, Dip],
+    shift: Dict[int, float] | None = None,
+) -> Dict[int, int]:
+    """
+    Assign full-scan dips to the previous step's tracks, predicted at
+    f0 + last shift. Tolerance: half the closest spacing between
+    previous dips.
+
+    Same dip count and every dip within tolerance of its track:
+    frequency-order alignment. Otherwise greedy nearest-f0 matching
+    within tolerance. Returns {dip index: track id}.
+    """
+    if not prev:
+        return {}
+    shift = shift or {}
+
+    prev_ids = sorted(prev, key=lambda tid: prev[tid].f0.f)
+    predicted = [prev[tid].f0.f + shift.get(tid, 0.0) for tid in prev_ids]
+    gaps = np.diff([prev[tid].f0.f for tid in prev_ids])
+    tol = gaps.min() / 2 if len(gaps) else float("inf")
+
+    if len(dips) == len(prev_ids) and all(
+        abs(d.f0.f - f0) <= tol for d, f0 in zip(dips, predicted)
+    ):
+        return dict(enumerate(prev_ids))
+
+    pairs = sorted(
+        (abs(d.f0.f - f0), i, tid)
+        for i, d in enumerate(dips)
+        for tid, f0 in zip(prev_ids, predicted)
+    )
+    matched: Dict[int, int] = {}
+    taken = set()
+    for dist, i, tid in pairs:
+        if dist > tol:
+            break
+        if i in matched or tid in taken:
             continue
+        matched[i] = tid
+        taken.add(tid)
+    return matched
 
-    # ---- order by frequency (low → high)
-    dips.sort(key=lambda d: d.f0.f)
 
-    return dips
+def track_dips(
+    traces: Sequence[List[Tuple[float, float]] | np.ndarray],
+    threshold_db: float = 3.0,
+    min_spacing: int = 3,
+    window: int = TRACK_WINDOW,
+    min_prominence_db: float = 0.0,
+    smooth: int = 0,
+    backend: str | None = None,
+) -> List[Dict[int, Dip]]:
+    """
+    Extract dips for an ordered sweep, warm-starting each step from
+    the previous step's dips (extrapolated by their last shift).
+
+    A step is a full scan (as extract_dips) matched onto the tracks
+    when the windowed search fails (a dip left the span, merged or
+    faded), when a dip shows near either end of the span (a resonance
+    entering; the edge strips are sized from the tracks' relative shift
+    and bandwidth), and every REFRESH_STEPS steps (dips appearing
+    mid-span).
+
+    Returns one {band index: Dip} per trace. Band indices are
+    consistent across steps (a resonance keeps its index while it
+    moves) and are numbered by mean f0, low → high.
+    """
+    steps: List[Dict[int, Dip]] = []
+    prev: Dict[int, Dip] = {}
+    shift: Dict[int, float] = {}    # last f0 step per track (GHz)
+    next_id = 0
+    since_scan = 0
+
+    kernels = get_backend(backend)
+
+    for data in traces:
+        # ---- the windowed search only reads around the dips and the
+        # edges, so it works on column views; a full scan copies
+        freq, s21 = _as_arrays(data, contiguous=False)
+
+        step = None
+        if prev and since_scan < REFRESH_STEPS:
+            centers = [d.f0.f + shift.get(tid, 0.0) for tid, d in prev.items()]
+            near = _near(freq, s21, centers, threshold_db, window, kernels)
+            if near is not None:
+                dips, found = near
+                # ---- how far a dip can sit inside an edge and still be
+                # new: two steps of the fastest relative shift plus the
+                # widest relative bandwidth (both scale with f in a sweep)
+                reach = 2 * max(
+                    (abs(v / prev[tid].f0.f) for tid, v in shift.items()),
+                    default=0.0,
+                ) + max(d.inv_q() for d in dips)
+                if not _entering(
+                    freq, s21, found, reach, window,
+                    threshold_db, min_prominence_db, smooth, kernels,
+                ):
+                    step = dict(zip(prev.keys(), dips))
+
+        if step is not None:
+            since_scan += 1
+        else:
+            # ---- full scan (same result as extract_dips)
+            freq, s21 = _as_arrays(data)
+            selected = _select(
+                s21, min_spacing, min_prominence_db, smooth, kernels
+            )
+            dips = [
+                d for d in _dips_at(freq, s21, selected, threshold_db, kernels)
+                if d is not None
+            ]
+            dips.sort(key=lambda d: d.f0.f)
+            matched = _match_tracks(dips, prev, shift)
+
+            step = {}
+            for i, dip in enumerate(dips):
+                tid = matched.get(i)
+                if tid is None:
+                    tid = next_id
+                    next_id += 1
+                step[tid] = dip
+            since_scan = 0
+
+        shift = {
+            tid: dip.f0.f - prev[tid].f0.f
+            for tid, dip in step.items() if tid in prev
+        }
+        steps.append(step)
+        prev = step
+
+    # ---- renumber tracks by mean f0 (band1 = lowest)
+    f0s: Dict[int, List[float]] = {}
+    for step in steps:
+        for tid, dip in step.items():
+            f0s.setdefault(tid, []).append(dip.f0.f)
+    order = sorted(f0s, key=lambda tid: np.mean(f0s[tid]))
+    band_of = {tid: b for b, tid in enumerate(order)}
+
+    return [
+        {band_of[tid]: dip for tid, dip in sorted(
+            step.items(), key=lambda kv: band_of[kv[0]]
+        )}
+        for step in steps
+    ]
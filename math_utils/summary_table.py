@@ -1,50 +1,117 @@
-import pandas as pd
-from typing import List, Any
+import numpy as np
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Any, Sequence, Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import os
+import re
+import site
+import threading
 
-from math_utils.signal_feature import extract_dips
+from math_utils.signal_feature import (
+    track_dips,
+    band_widths,
+    DipSettings,
+    TRACK_WINDOW,
+)
 from math_utils.rf_metrics import (
-    frequency_shift_MHz,
-    sensitivity,
+    fit_trends,
     window_size,
 )
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 # ============================================================
 # Summary table (complete, physics-correct, n-band)
 # ============================================================
 
+def _sweep_order_key(config, sweep_param: str):
+    """
+    Group results by their other parameters, then order by the sweep
+    value, so neighbouring steps are neighbouring in the sweep.
+    """
+    others = tuple(sorted(
+        (k, v) for k, v in config.items() if k != sweep_param
+    ))
+    return others, config[sweep_param]
+
+
+def order_sweep(results: List[Any], sweep_param: str) -> List[Any]:
+    """Results that have sweep_param, in tracking order"""
+    swept = [r for r in results if sweep_param in r.config]
+    return sorted(
+        swept, key=lambda r: _sweep_order_key(r.config, sweep_param)
+    )
+
+
 def build_summary_table(
     results: List[Any],
     sweep_param: str,
     er_base: float = 1.0,
-) -> pd.DataFrame:
+    track_window: int = TRACK_WINDOW,
+    dip_settings: DipSettings = DipSettings(),
+    extra_thresholds: Sequence[float] = (),
+) -> "pd.DataFrame":
+    band_table = build_band_table(
+        results,
+        sweep_param,
+        track_window=track_window,
+        dip_settings=dip_settings,
+        extra_thresholds=extra_thresholds,
+    )
+    return add_shift_metrics(band_table, sweep_param, er_base)
+
+
+def build_band_table(
+    results: List[Any],
+    sweep_param: str,
+    track_window: int = TRACK_WINDOW,
+    dip_settings: DipSettings = DipSettings(),
+    extra_thresholds: Sequence[float] = (),
+    tracked: List[Dict[int, Any]] | None = None,
+    ordered: List[Any] | None = None,
+) -> "pd.DataFrame":
+    """
+    Summary table without the er_base-dependent columns
+    (see add_shift_metrics). tracked: precomputed track_dips output
+    for `ordered` (default order_sweep(results, sweep_param)), if
+    already available; rows keep the order of results.
+    """
+    import pandas as pd
 
     rows = []
 
     # --------------------------------------------------------
-    # Baseline f0 (only for permittivity sweep)
+    # Band extraction (tracked along the sweep)
     # --------------------------------------------------------
-    baseline_f0 = None
-    if sweep_param == "er":
-        for r in results:
-            if sweep_param in r.config and r.config[sweep_param] == er_base:
-                dips = extract_dips(r.data)
-                baseline_f0 = [d.f0.f for d in dips]
-                break
-
-        if baseline_f0 is None:
-            raise ValueError(f"Baseline er={er_base} not found")
+    swept = [r for r in results if sweep_param in r.config]
+    if ordered is None:
+        ordered = order_sweep(swept, sweep_param)
+    if len(ordered) != len(swept):
+        raise ValueError("Tracked sweep does not match the results")
+    if tracked is None:
+        tracked = track_dips(
+            [r.data for r in ordered],
+            window=track_window,
+            **dip_settings.kwargs(),
+        )
+    bands_of = {id(r): bands for r, bands in zip(ordered, tracked)}
 
     # --------------------------------------------------------
     # Main loop
     # --------------------------------------------------------
-    for r in results:
-        if sweep_param not in r.config:
-            continue
-
-        dips = extract_dips(r.data)
+    for r in swept:
+        bands = bands_of[id(r)]
         row = {}
 
+        widths = dict(zip(
+            bands,
+            band_widths(r.data, list(bands.values()), extra_thresholds)
+        )) if extra_thresholds else {}
+
         # ----------------------------------------------------
         # Sweep parameter
         # ----------------------------------------------------
@@ -53,7 +120,7 @@ def build_summary_table(
         # ----------------------------------------------------
         # Per-band features
         # ----------------------------------------------------
-        for i, dip in enumerate(dips):
+        for i, dip in bands.items():
             p = f"band{i+1}"
 
             # ---- geometry / signal
@@ -74,39 +141,18 @@ def build_summary_table(
             row[f"{p}_q"] = q
             row[f"{p}_1/q"] = dip.inv_q()
 
-            # ------------------------------------------------
-            # Frequency shift & sensitivities
-            # ------------------------------------------------
-            if sweep_param == "er":
-                f0_base = baseline_f0[i]
-
-                df_MHz = frequency_shift_MHz(dip, f0_base)
-                row[f"{p}_f0-f0base(MHz)"] = df_MHz
-                row[f"{p}_|f0-f0base|(MHz)"] = abs(df_MHz)
-
-                er = r.config["er"]
-                delta_er = er - er_base
-
-                # ---- raw sensitivity (MHz / εr)
-                row[f"{p}_sen_norm"] = sensitivity(
-                    dip=dip,
-                    f0_base=f0_base,
-                    er=er,
-                    er_base=er_base,
-                )
-
-            else:
-                # ---- not applicable for other sweeps
-                row[f"{p}_f0-f0base(MHz)"] = float("nan")
-                row[f"{p}_|f0-f0base|(MHz)"] = float("nan")
-                row[f"{p}_sen_norm"] = float("nan")
+            # ---- extra bandwidth thresholds (e.g. 6 / 10 dB)
+            for t, d_t in widths.get(i, {}).items():
+                row[f"{p}_bw{t:g}dB(GHz)"] = d_t.bw() if d_t else float("nan")
+                row[f"{p}_q{t:g}dB"] = d_t.q() if d_t else float("nan")
 
         # ----------------------------------------------------
         # Inter-band spacing
         # ----------------------------------------------------
-        for i in range(len(dips) - 1):
-            row[f"window_band{i+1}_{i+2}_GHz"] = window_size(
-                dips[i], dips[i + 1]
+        ids = list(bands)
+        for i, j in zip(ids, ids[1:]):
+            row[f"window_band{i+1}_{j+1}_GHz"] = window_size(
+                bands[i], bands[j]
             )
 
         # ----------------------------------------------------
@@ -118,10 +164,398 @@ def build_summary_table(
         rows.append(row)
 
     # --------------------------------------------------------
-    # Final DataFrame
+    # Final DataFrame (stable: equal sweep values keep input order)
     # --------------------------------------------------------
     return (
         pd.DataFrame(rows)
-        .sort_values(sweep_param)
+        .sort_values(sweep_param, kind="stable")
         .reset_index(drop=True)
     )
+
+
+_F0_COL = re.compile(r"^band(\d+)_f0_f\(GHz\)$")
+
+
+def add_shift_metrics(
+    band_table: "pd.DataFrame",
+    sweep_param: str,
+    er_base: float = 1.0,
+) -> "pd.DataFrame":
+    """
+    Add the frequency-shift / sensitivity columns of each band (after
+    that band's other columns), relative to the first er = er_base row.
+    NaN unless sweeping er. Vectorized; the band table is not modified.
+    """
+    import pandas as pd
+
+    df = band_table
+    band_ids = [m.group(1) for c in df.columns if (m := _F0_COL.match(c))]
+
+    # --------------------------------------------------------
+    # Baseline row (only for permittivity sweep)
+    # --------------------------------------------------------
+    base = None
+    if sweep_param == "er":
+        hits = np.flatnonzero(df[sweep_param].to_numpy() == er_base)
+        if not len(hits):
+            raise ValueError(f"Baseline er={er_base} not found")
+        base = hits[0]
+        delta_er = df[sweep_param].to_numpy(dtype=float) - er_base
+
+    # --------------------------------------------------------
+    # Frequency shift & sensitivities
+    # --------------------------------------------------------
+    columns = list(df.columns)
+    added: Dict[str, np.ndarray] = {}
+    for b in band_ids:
+        p = f"band{b}"
+        f0 = df[f"{p}_f0_f(GHz)"].to_numpy(dtype=float)
+
+        if base is not None:
+            f0_base = f0[base]
+            shift = (f0 - f0_base) * 1e3
+            with np.errstate(divide="ignore", invalid="ignore"):
+                sen = (np.abs(f0 - f0_base) / delta_er) * 100 / f0_base
+            sen[delta_er == 0] = np.nan
+        else:
+            shift = sen = np.full(len(df), np.nan)
+
+        new = {
+            f"{p}_f0-f0base(MHz)": shift,
+            f"{p}_|f0-f0base|(MHz)": np.abs(shift),
+            f"{p}_sen_norm": sen,
+        }
+        added.update(new)
+
+        last = max(i for i, c in enumerate(columns) if c.startswith(f"{p}_"))
+        columns[last + 1:last + 1] = list(new)
+
+    added_df = pd.DataFrame(added, index=df.index, columns=list(added))
+    return pd.concat([df, added_df], axis=1)[columns]
+
+
+# ============================================================
+# Band feature matrices (vectorized, for plotting)
+# ============================================================
+
+# feature -> (label, unit)
+BAND_FEATURES = {
+    "f0": ("Resonant frequency", "GHz"),
+    "s21": ("S2,1 at f0", "dB"),
+    "q": ("Q", ""),
+    "bw": ("Bandwidth", "GHz"),
+    "sensitivity": ("Normalized sensitivity", "%/εr"),
+}
+
+
+def band_arrays(tracked: List[Dict[int, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Tracked dips -> (n_results, n_bands) matrices of f1 / f0 / f2 / s21
+    (NaN where a band is missing). The only per-dip Python pass;
+    everything derived from them is vectorized.
+    """
+    n_bands = 1 + max((b for step in tracked for b in step), default=-1)
+    arrays = {
+        k: np.full((len(tracked), n_bands), np.nan)
+        for k in ("f1", "f0", "f2", "s21")
+    }
+    for i, step in enumerate(tracked):
+        for b, dip in step.items():
+            arrays["f1"][i, b] = dip.f1.f
+            arrays["f0"][i, b] = dip.f0.f
+            arrays["f2"][i, b] = dip.f2.f
+            arrays["s21"][i, b] = dip.f0.s21
+    return arrays
+
+
+def band_features(
+    arrays: Dict[str, np.ndarray],
+    features: Sequence[str],
+    er: np.ndarray | None = None,
+    er_base: float = 1.0,
+) -> Dict[str, np.ndarray]:
+    """
+    Requested BAND_FEATURES as (n_results, n_bands) matrices.
+    sensitivity needs the er value of each row (NaN otherwise), and
+    matches rf_metrics.sensitivity(norm=True).
+    """
+    f0 = arrays["f0"]
+    out: Dict[str, np.ndarray] = {}
+
+    for feat in features:
+        if feat in ("f0", "s21"):
+            out[feat] = arrays[feat]
+        elif feat == "bw":
+            out[feat] = arrays["f2"] - arrays["f1"]
+        elif feat == "q":
+            out[feat] = f0 / (arrays["f2"] - arrays["f1"])
+        elif feat == "sensitivity":
+            out[feat] = np.full_like(f0, np.nan)
+            if er is None:
+                continue
+            base = np.flatnonzero(er == er_base)
+            if not len(base):
+                continue
+            f0_base = f0[base[0]]
+            delta = (er - er_base)[:, None]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                sen = np.abs(f0 - f0_base) / delta * 100 / f0_base
+            out[feat] = np.where(delta == 0, np.nan, sen)
+        else:
+            raise ValueError(f"Unknown band feature: {feat}")
+
+    return out
+
+
+# ============================================================
+# Trend fits over summary tables
+# ============================================================
+
+_BAND_COL = re.compile(r"^band(\d+)_(.+)$")
+
+
+def band_feature_names(df: "pd.DataFrame") -> List[str]:
+    """Per-band column suffixes, e.g. 'f0_f(GHz)', 'q'"""
+    names: Dict[str, None] = {}
+    for col in df.columns:
+        m = _BAND_COL.match(col)
+        if m:
+            names[m.group(2)] = None
+    return list(names)
+
+
+def build_trend_table(
+    df: "pd.DataFrame",
+    sweep_param: str,
+    feature: str = "f0_f(GHz)",
+    er_base: float = 1.0,
+) -> "pd.DataFrame":
+    """
+    Fit band<i>_<feature> against sweep_param for every band and
+    source file of a (combined) summary table in one vectorized pass.
+    One row per (file, band): slope, intercept, r2, n, plus the fitted
+    normalized sensitivity for f0 along an er sweep.
+    """
+    import pandas as pd
+
+    cols = sorted(
+        (c for c in df.columns
+         if (m := _BAND_COL.match(c)) and m.group(2) == feature),
+        key=lambda c: int(_BAND_COL.match(c).group(1)),
+    )
+    if not cols:
+        raise ValueError(f"No band column for feature: {feature}")
+    bands = [int(_BAND_COL.match(c).group(1)) for c in cols]
+
+    # ---- (rows per file, files, bands) cube, NaN-padded
+    source = (
+        df["source_file"] if "source_file" in df.columns
+        else pd.Series("", index=df.index)
+    )
+    files = pd.unique(source)
+    pos = source.groupby(source, sort=False).cumcount().to_numpy()
+    idx = pd.Index(files).get_indexer(source)
+    n_rows = int(pos.max()) + 1 if len(pos) else 0
+
+    x = np.full((n_rows, len(files), 1), np.nan)
+    y = np.full((n_rows, len(files), len(cols)), np.nan)
+    x[pos, idx, 0] = df[sweep_param].to_numpy(dtype=float)
+    y[pos, idx] = df[cols].to_numpy(dtype=float)
+
+    shape = (n_rows, len(files) * len(cols))
+    fit = fit_trends(np.broadcast_to(x, y.shape).reshape(shape), y.reshape(shape))
+
+    out = pd.DataFrame({
+        "source_file": np.repeat(files, len(cols)),
+        "band": np.tile(bands, len(files)),
+        "slope": fit.slope,
+        "intercept": fit.intercept,
+        "r2": fit.r2,
+        "n": fit.n,
+    })
+    if sweep_param == "er" and feature == "f0_f(GHz)":
+        out["sen_norm_fit"] = fit.sensitivity(er_base)
+    if "source_file" not in df.columns:
+        out = out.drop(columns="source_file")
+    return out
+
+
+# ============================================================
+# Combined summary (many files, in parallel)
+# ============================================================
+
+# Worker processes for combined tables (started on first use)
+PROCESS_WORKERS = os.cpu_count() or 1
+
+# Preloaded into the forkserver (see math_utils/process_worker.py)
+WORKER_MODULE = "math_utils.process_worker"
+
+_processes: ProcessPoolExecutor | None = None
+_processes_lock = threading.Lock()
+
+
+def _forkserver_can_import() -> bool:
+    """
+    True if the forkserver can import WORKER_MODULE: it starts with a
+    fresh interpreter's sys.path (working directory, PYTHONPATH, site
+    packages), not this process's, and skips preloads it cannot find.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return False
+    root = Path(__file__).resolve().parents[1]
+    paths = [
+        os.getcwd(),
+        *os.environ.get("PYTHONPATH", "").split(os.pathsep),
+        *site.getsitepackages(),
+    ]
+    return any(p and Path(p).resolve() == root for p in paths)
+
+
+def process_pool() -> ProcessPoolExecutor | None:
+    """
+    Long-lived process pool shared by all combined-table builds, or
+    None where workers cannot be started cleanly (jobs then run in the
+    calling thread). Workers fork from a forkserver that preloads
+    WORKER_MODULE, not from the threaded server process.
+    """
+    global _processes
+    with _processes_lock:
+        if _processes is None and _forkserver_can_import():
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload([WORKER_MODULE])
+            _processes = ProcessPoolExecutor(
+                max_workers=PROCESS_WORKERS,
+                mp_context=context,
+            )
+        return _processes
+
+
+def _reset_process_pool(broken: ProcessPoolExecutor) -> None:
+    """Drop a pool whose worker died; the next call starts a new one"""
+    global _processes
+    with _processes_lock:
+        if _processes is broken:
+            _processes = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+class _Block:
+    """
+    Picklable stand-in for Result: config plus either an (N, 2) point
+    array or, for results mapped from a File's point store, their
+    (first point, point count) span in it (mapped by the worker).
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, float],
+        data: np.ndarray | None = None,
+        span: Tuple[int, int] | None = None,
+    ):
+        self.config = config
+        self.data = data
+        self.span = span
+
+
+def _map_blocks(store_path: str | None, blocks: List[_Block]) -> None:
+    """Point each spanned block's data into the store (read-only)"""
+    spans = [b.span for b in blocks if b.span is not None]
+    if not spans:
+        return
+    n_points = max(start + count for start, count in spans)
+    store = np.memmap(
+        store_path, dtype=np.float64, mode="r", shape=(n_points, 2)
+    )
+    for b in blocks:
+        if b.span is not None:
+            start, count = b.span
+            b.data = store[start:start + count]
+
+
+def _band_table_job(
+    name: str,
+    store_path: str | None,
+    blocks: List[_Block],
+    sweep_param: str,
+    dip_settings: DipSettings,
+    extra_thresholds: Sequence[float],
+) -> "pd.DataFrame":
+    try:
+        _map_blocks(store_path, blocks)
+        df = build_band_table(
+            blocks,
+            sweep_param,
+            dip_settings=dip_settings,
+            extra_thresholds=extra_thresholds,
+        )
+    except Exception as e:
+        raise ValueError(f"{name}: {e}") from e
+    df.insert(0, "source_file", name)
+    return df
+
+
+def band_table_jobs(
+    files: List[Any],
+    sweep_param: str,
+    extra_thresholds: Sequence[float] = (),
+) -> List[tuple]:
+    """
+    One picklable band-table job per file that has sweep_param.
+    Results mapped from a point store are sent as spans, not copied.
+    """
+    jobs = []
+    for f in files:
+        blocks = []
+        for i, r in enumerate(list(f.results)):
+            if sweep_param not in r.config:
+                continue
+            span = f.store_span(i)
+            if span is not None:
+                blocks.append(_Block(dict(r.config), span=span))
+            else:
+                blocks.append(_Block(
+                    dict(r.config),
+                    np.asarray(r.data, dtype=float).reshape(-1, 2),
+                ))
+        if blocks:
+            store = str(f.store_path) if f.store_path is not None else None
+            jobs.append((
+                f.display_name, store, blocks, sweep_param,
+                f.dip_settings, tuple(extra_thresholds),
+            ))
+
+    if not jobs:
+        raise ValueError(f"No file contains sweep parameter {sweep_param}")
+    return jobs
+
+
+def run_band_table_job(job: tuple) -> "pd.DataFrame":
+    """
+    One job of band_table_jobs on process_pool() (blocks until done;
+    runs in this thread where there is no process pool).
+    """
+    pool = process_pool()
+    if pool is None:
+        return _band_table_job(*job)
+    try:
+        return pool.submit(_band_table_job, *job).result()
+    except BrokenProcessPool:
+        _reset_process_pool(pool)
+        raise
+
+
+def combine_summaries(
+    band_tables: List["pd.DataFrame"],
+    sweep_param: str,
+    er_base: float = 1.0,
+) -> "pd.DataFrame":
+    """add_shift_metrics per file, concatenated"""
+    import pandas as pd
+
+    tables = []
+    for t in band_tables:
+        try:
+            tables.append(add_shift_metrics(t, sweep_param, er_base))
+        except ValueError as e:
+            raise ValueError(f"{t['source_file'].iat[0]}: {e}") from e
+    return pd.concat(tables, ignore_index=True)
@@ -1,9 +1,18 @@
 import streamlit as st
 from pathlib import Path
-from datetime import datetime
+import shutil
 
 from core.file import File
+from core.storage import (
+    UPLOAD_TYPES,
+    allocate_run_dir,
+    store_upload,
+    upload_display_name,
+)
+from core.store import ResultStore
 from core.auth import require_login
+from core.loading import load_run
+from core.workers import PoolBusy
 
 require_login()
 
@@ -11,29 +20,38 @@ st.title("Upload")
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 UPLOAD_DIR = BASE_DIR / "db" / "upload"
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+STORE_PATH = BASE_DIR / "db" / "results.sqlite"
 
 uploaded_files = st.file_uploader(
-    "Upload S-parameter .txt files",
-    type=["txt"],
+    "Upload S-parameter .txt files (or .txt.gz / .zst / .zip)",
+    type=UPLOAD_TYPES,
     accept_multiple_files=True
 )
 
 if uploaded_files and st.button("Execute"):
-    run_id = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    run_upload_dir = UPLOAD_DIR / run_id
-    run_upload_dir.mkdir(parents=True, exist_ok=True)
-
-    files = []
-
-    for uploaded in uploaded_files:
-        path = run_upload_dir / uploaded.name
-        path.write_bytes(uploaded.read())
-        f = File.from_txt(path, display_name=uploaded.name)
-        files.append(f)
-
-    st.session_state["files"] = files
-    st.session_state["current_run_id"] = run_id
+    run_upload_dir = allocate_run_dir(UPLOAD_DIR)
+    run_id = run_upload_dir.name
+
+    try:
+        stored = [
+            store_upload(uploaded, uploaded.name, run_upload_dir)
+            for uploaded in uploaded_files
+        ]
+    except ValueError as e:
+        shutil.rmtree(run_upload_dir, ignore_errors=True)
+        st.error(f"Upload rejected: {e}")
+        st.stop()
+
+    files = [File(p, display_name=upload_display_name(p)) for p in stored]
+
+    # ---- parsing runs on the shared worker pool; files are registered
+    # before parsing so other pages can already use the blocks parsed
+    try:
+        load_run(run_id, files, ResultStore(STORE_PATH))
+    except PoolBusy as e:
+        st.warning(f"{e}. The upload is kept as run `{run_id}` "
+                   "and can be restored from **History**.")
+        st.stop()
 
     st.success(f"Run `{run_id}` executed successfully.")
     st.info("Go to **File Overview** or **Plotting**.")
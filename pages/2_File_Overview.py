@@ -17,17 +17,29 @@ for f in files:
 
         st.markdown(f"**Total result blocks:** {len(f.results)}")
 
+        if f.parse_state in ("pending", "parsing"):
+            st.info("Parsing… showing the blocks read so far.")
+        elif f.parse_state == "failed":
+            st.error(f"Parsing failed: {f.load_error}. "
+                     "Showing the blocks read so far.")
+        elif f.parse_state == "interrupted":
+            st.warning("Parsing was interrupted; showing the blocks read so far.")
+
         if not f.results:
             st.info("No parsed results.")
             continue
 
-        # ---- minimal dip display ----
+        # ---- minimal dip display (dip settings from the Table page) ----
+        f.set_dip_settings(st.session_state.get("dip_settings", f.dip_settings))
         f.analyze_bands_once()
         dip = f.dip_summary()["expected"]
 
         if dip is not None:
             st.markdown(f"**Resonance dips:** {dip}")
 
+        if st.checkbox("Show memory usage", key=f"mem_{f.path}"):
+            st.json(f.memory_usage())
+
         # ---- sweep overview ----
         st.subheader("Sweep overview")
 
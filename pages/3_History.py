@@ -2,7 +2,11 @@ import streamlit as st
 from pathlib import Path
 
 from core.file import File
+from core.storage import is_upload, upload_display_name
+from core.store import ResultStore
 from core.auth import require_login
+from core.loading import load_run
+from core.workers import PoolBusy
 
 require_login()
 
@@ -14,6 +18,7 @@ st.caption("Restore application state from previous uploads")
 # =========================
 BASE_DIR = Path(__file__).resolve().parents[1]
 UPLOAD_DIR = BASE_DIR / "db" / "upload"
+STORE_PATH = BASE_DIR / "db" / "results.sqlite"
 
 if not UPLOAD_DIR.exists():
     st.info("No upload history found.")
@@ -40,7 +45,7 @@ run_id = st.selectbox(
 )
 
 run_path = UPLOAD_DIR / run_id
-upload_files = sorted(run_path.glob("*.txt"))
+upload_files = sorted(p for p in run_path.iterdir() if is_upload(p))
 
 if not upload_files:
     st.warning("Selected run contains no uploaded files.")
@@ -59,15 +64,20 @@ for p in upload_files:
 st.divider()
 
 if st.button("🔄 Restore this run"):
-    files = []
-
-    with st.spinner("Restoring state from uploaded files..."):
-        for p in upload_files:
-            f = File.from_txt(p, display_name=p.name)
-            files.append(f)
-
-    st.session_state["files"] = files
-    st.session_state["current_run_id"] = run_id
+    files = [File(p, display_name=upload_display_name(p)) for p in upload_files]
+
+    # ---- parsing runs on the shared worker pool (runs uploaded before
+    # the store existed are indexed as well)
+    try:
+        with st.spinner("Restoring state from uploaded files..."):
+            load_run(run_id, files, ResultStore(STORE_PATH))
+    except PoolBusy as e:
+        st.warning(str(e))
+        st.stop()
+    except ValueError as e:
+        # e.g. multi-export zip archives stored before they were refused
+        st.error(f"Could not restore run `{run_id}`: {e}")
+        st.stop()
 
     st.success(f"Run `{run_id}` restored successfully.")
     st.info("You can now navigate to **File Overview**, **Plotting**, or **Sweeping**.")
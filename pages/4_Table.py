@@ -1,8 +1,16 @@
 import streamlit as st
-import pandas as pd
+from dataclasses import replace
 
-from core.auth import require_login
-from math_utils.summary_table import build_summary_table
+from core.auth import require_login, session_id
+from core.table_view import column_groups, filter_mask, parse_filter, query_table
+from core.workers import PoolBusy, get_pool
+from math_utils.summary_table import (
+    band_feature_names,
+    band_table_jobs,
+    build_trend_table,
+    combine_summaries,
+    run_band_table_job,
+)
 
 
 # ============================================================
@@ -16,7 +24,7 @@ require_login()
 # ============================================================
 
 st.title("Calculation Table")
-st.caption("Sweep-based resonance summary (baseline er = 1.0)")
+st.caption("Sweep-based resonance summary")
 
 # ============================================================
 # Load files
@@ -29,22 +37,85 @@ if not files:
     st.stop()
 
 # ============================================================
-# Select file
+# Analysis settings (all loaded files)
 # ============================================================
+#
+# Only stages downstream of a changed setting are recomputed:
+# er_base → shift / sensitivity columns; dip settings → bands onward.
+
+with st.expander("Analysis settings"):
+    current = st.session_state.get("dip_settings", files[0].dip_settings)
+    s1, s2, s3 = st.columns(3)
+    threshold_db = s1.number_input(
+        "Dip threshold (dB)", min_value=0.5, max_value=30.0,
+        value=float(current.threshold_db), step=0.5,
+    )
+    min_spacing = s2.number_input(
+        "Min dip spacing (points)", min_value=1, max_value=1000,
+        value=int(current.min_spacing), step=1,
+    )
+    er_base = s3.number_input(
+        "Baseline er", min_value=0.0,
+        value=float(st.session_state.get("er_base", 1.0)), step=0.1,
+        format="%g",
+    )
+    s4, s5, _ = st.columns(3)
+    min_prominence_db = s4.number_input(
+        "Min dip prominence (dB)", min_value=0.0, max_value=30.0,
+        value=float(current.min_prominence_db), step=0.5,
+        help="Drops shallow noise minima (0 = off; measured traces)",
+    )
+    smooth = s5.number_input(
+        "Smoothing (points)", min_value=0, max_value=101,
+        value=int(current.smooth), step=2,
+        help="Moving-average width before the dip search (0 = off)",
+    )
+    st.session_state["er_base"] = er_base
 
-f = st.selectbox(
-    "Select file",
-    files,
-    format_func=lambda x: x.display_name
+# (kept in session state so File Overview analyzes with the same settings)
+dip_settings = st.session_state["dip_settings"] = replace(
+    current,
+    threshold_db=threshold_db,
+    min_spacing=int(min_spacing),
+    min_prominence_db=min_prominence_db,
+    smooth=int(smooth),
 )
+for file_obj in files:
+    file_obj.set_dip_settings(dip_settings)
 
-if not f.results:
-    st.info("Selected file has no results.")
-    st.stop()
+# ============================================================
+# Select file (or combine all files)
+# ============================================================
 
-if not f.overview:
-    st.error("No valid sweep detected in this file.")
-    st.stop()
+combine = st.toggle(
+    "Combine all files",
+    value=False,
+    disabled=len(files) < 2,
+    help="One table for every loaded file, built in parallel",
+)
+
+if combine:
+    sweeps = sorted(set().union(*(f.overview.keys() for f in files)))
+    if not sweeps:
+        st.error("No valid sweep detected in any file.")
+        st.stop()
+else:
+    # (by index: object options are deep-copied into widget state)
+    f = files[st.selectbox(
+        "Select file",
+        range(len(files)),
+        format_func=lambda i: files[i].display_name
+    )]
+
+    if not f.results:
+        st.info("Selected file has no results.")
+        st.stop()
+
+    if not f.overview:
+        st.error("No valid sweep detected in this file.")
+        st.stop()
+
+    sweeps = list(f.overview.keys())
 
 # ============================================================
 # Select sweep parameter
@@ -52,65 +123,150 @@ if not f.overview:
 
 sweep_param = st.selectbox(
     "Select sweep parameter",
-    list(f.overview.keys())
+    sweeps
+)
+
+extra_thresholds = st.multiselect(
+    "Extra bandwidth thresholds (dB)",
+    [6.0, 10.0, 20.0],
+    format_func=lambda t: f"{t:g} dB",
 )
 
 # ============================================================
-# Build summary table
+# Build summary table (staged and cached; heavy stages run on the
+# shared worker pool)
 # ============================================================
 
-df = build_summary_table(
-    results=f.results,
-    sweep_param=sweep_param
-)
+def file_key(f) -> tuple:
+    return (str(f.path), len(f.results), f.dip_settings)
+
+
+@st.cache_resource(max_entries=4, show_spinner="Building combined table...")
+def cached_band_tables(_files, key):
+    # one pool job per file, each handing its table to the process pool
+    _, sweep_param, extra_thresholds = key
+    jobs = band_table_jobs(_files, sweep_param, extra_thresholds)
+    futures = get_pool().submit_map(session_id(), run_band_table_job, jobs)
+    return [future.result() for future in futures]
+
+
+@st.cache_resource(max_entries=8)
+def cached_combined(_band_tables, key):
+    _, sweep_param, _, er_base = key
+    return combine_summaries(_band_tables, sweep_param, er_base)
+
+
+try:
+    if combine:
+        key = (
+            tuple(file_key(f) for f in files),
+            sweep_param,
+            tuple(extra_thresholds),
+        )
+        df = cached_combined(cached_band_tables(files, key), key + (er_base,))
+    else:
+        with st.spinner("Building summary table..."):
+            df = get_pool().run(
+                session_id(),
+                f.pipeline.summary,
+                sweep_param,
+                tuple(extra_thresholds),
+                er_base,
+            )
+except PoolBusy as e:
+    st.warning(str(e))
+    st.stop()
+except ValueError as e:
+    st.error(f"Summary table error: {e}")
+    st.stop()
 
 # ============================================================
-# Filter bar
+# Filter / sort / columns
 # ============================================================
 
 st.subheader("Calculation result")
-st.caption("Filter format: column=value (space separated)")
+st.caption("Filter format: column=value or column>value (space separated)")
 
 filter_text = st.text_input(
     "Filter",
-    placeholder="er=2 tan_delta=0.02"
+    placeholder="er=2 band1_q>100"
 )
 
-df_filtered = df
-
-if filter_text.strip():
-    try:
-        conditions = filter_text.split()
-        mask = pd.Series(True, index=df.index)
-
-        for cond in conditions:
-            if "=" not in cond:
-                raise ValueError(f"Invalid condition: {cond}")
-
-            col, val = cond.split("=", 1)
-            col = col.strip()
-            val = val.strip()
+groups = column_groups(df, sweep_param)
+shown_groups = st.multiselect(
+    "Column groups",
+    list(groups),
+    default=list(groups),
+)
+columns = (
+    (["source_file"] if combine else [])
+    + [sweep_param]
+    + [c for g in shown_groups for c in groups[g]]
+)
 
-            if col not in df.columns:
-                raise ValueError(f"Unknown column: {col}")
+c1, c2, c3, c4 = st.columns([3, 1, 1, 1])
+sort_by = c1.selectbox("Sort by", list(df.columns))
+ascending = c2.toggle("Ascending", value=True)
+page_size = c3.selectbox("Rows / page", [25, 50, 100, 250], index=1)
 
-            if pd.api.types.is_numeric_dtype(df[col]):
-                mask &= df[col] == float(val)
-            else:
-                mask &= df[col].astype(str) == val
+try:
+    conditions = parse_filter(filter_text)
+    total = len(df) if not conditions else int(
+        filter_mask(df, conditions).sum()
+    )
+except Exception as e:
+    st.error(f"Filter error: {e}")
+    st.stop()
 
-        df_filtered = df[mask]
-
-    except Exception as e:
-        st.error(f"Filter error: {e}")
-        st.stop()
+n_pages = max(1, -(-total // page_size))
+page = c4.number_input("Page", min_value=1, max_value=n_pages, value=1)
 
 # ============================================================
-# Display table
+# Display table (visible page only)
 # ============================================================
 
+df_page, total = query_table(
+    df,
+    conditions=conditions,
+    sort_by=sort_by,
+    ascending=ascending,
+    columns=columns,
+    page=page,
+    page_size=page_size,
+)
+
+first = (page - 1) * page_size
+st.caption(
+    f"Rows {min(first + 1, total)}–{first + len(df_page)} of {total} "
+    f"(page {page} / {n_pages})"
+)
+
 st.dataframe(
-    df_filtered,
+    df_page,
     use_container_width=True,
     hide_index=True
 )
+
+# ============================================================
+# Trend fit (all bands / files at once, filtered rows only)
+# ============================================================
+
+st.subheader("Trend fit")
+st.caption(f"Least-squares line of each band feature against {sweep_param}")
+
+features = band_feature_names(df)
+if features:
+    feature = st.selectbox(
+        "Band feature",
+        features,
+        index=features.index("f0_f(GHz)") if "f0_f(GHz)" in features else 0,
+    )
+    fit_rows = df[filter_mask(df, conditions)] if conditions else df
+    if fit_rows.empty:
+        st.info("No rows match the filter, nothing to fit.")
+    else:
+        st.dataframe(
+            build_trend_table(fit_rows, sweep_param, feature, er_base),
+            use_container_width=True,
+            hide_index=True
+        )
@@ -1,14 +1,14 @@
-import streamlit as st
 import numpy as np
-import plotly.graph_objects as go
+import streamlit as st
 
-from core.auth import require_login
-from math_utils.summary_table import build_summary_table
+from core.auth import require_login, session_id
+from core.workers import PoolBusy, get_pool
+from math_utils.summary_table import BAND_FEATURES, band_features
 
 require_login()
 
 st.title("Plotting")
-st.caption("Frequency response and dual-band comparison")
+st.caption("Frequency response and multi-band comparison")
 
 # ============================================================
 # Helpers
@@ -69,11 +69,12 @@ if not files:
 # ============================================================
 # File selection
 # ============================================================
-f = st.selectbox(
+# (by index: object options are deep-copied into widget state)
+f = files[st.selectbox(
     "Select file",
-    files,
-    format_func=lambda x: x.display_name
-)
+    range(len(files)),
+    format_func=lambda i: files[i].display_name
+)]
 
 results = f.results
 
@@ -116,7 +117,7 @@ if not filtered_results:
 # ============================================================
 plot_type = st.radio(
     "Plot type",
-    ["Frequency × S2,1", "Compare 2 bands"],
+    ["Frequency × S2,1", "Compare bands"],
     horizontal=True
 )
 
@@ -134,21 +135,33 @@ if plot_type == "Frequency × S2,1":
         )
     )
 
+    max_points = st.selectbox(
+        "Max points per trace",
+        [2000, 5000, 20000, 0],
+        format_func=lambda n: "All" if n == 0 else f"{n:,}",
+        help="Min/max decimation keeps resonance dips visible",
+    )
+
     if st.button("Plot"):
-        fig = go.Figure()
+        from core.figure_cache import FigureState, prepare_trace
 
+        # ---- figure + prepared traces persist across reruns; only
+        # added / removed results are touched
+        states = st.session_state.setdefault("figure_states", {})
+        state = states.setdefault(str(f.path), FigureState())
+
+        position = {id(r): n for n, r in enumerate(f.results)}
+        wanted = []
         for i in selected:
             r = filtered_results[i]
-            freq = np.array([p[0] for p in r.data])
-            s21 = np.array([p[1] for p in r.data])
-
-            fig.add_trace(go.Scatter(
-                x=freq,
-                y=s21,
-                mode="lines",
-                name=build_legend_label(r, sweep_param)
+            wanted.append((
+                (position[id(r)], max_points),
+                build_legend_label(r, sweep_param),
+                lambda r=r: prepare_trace(*r.get_arrays(), max_points),
             ))
 
+        fig = state.sync(wanted)
+
         fig.update_layout(
             title=f.display_name,
             xaxis_title="Frequency (GHz)",
@@ -171,73 +184,81 @@ if plot_type == "Frequency × S2,1":
         )
 
 # ============================================================
-# -------- Compare 2 bands (USING SUMMARY TABLE) --------
+# -------- Compare bands (from cached band features) --------
 # ============================================================
 else:
-    st.subheader("Compare 2 bands")
+    st.subheader("Compare bands")
+
+    params = list(f.overview.keys()) if f.overview else []
+    if not params:
+        st.warning("No swept parameters in this file.")
+        st.stop()
 
     # X parameter (sweep axis)
-    x_param = st.selectbox(
-        "X parameter",
-        list(filtered_results[0].config.keys())
-    )
+    x_param = st.selectbox("X parameter", params)
 
     # Y metric
     y_metric = st.selectbox(
         "Y metric",
-        ["s21", "Q", "fres"]
+        list(BAND_FEATURES),
+        format_func=lambda k: BAND_FEATURES[k][0],
     )
 
-    if st.button("Plot"):
-        # --------------------------------------------
-        # Build summary table (single source of truth)
-        # --------------------------------------------
-        try:
-            df = build_summary_table(filtered_results, sweep_param=x_param)
-        except Exception as e:
-            st.error(f"Summary table error: {e}")
-            st.stop()
-
-        x = df[x_param]
-
-        if y_metric == "s21":
-            y_low = df["low_s21 (dB)"]
-            y_high = df["high_s21 (dB)"]
-            y_label = "S2,1 (dB)"
-
-        elif y_metric == "Q":
-            y_low = df["Q_low"]
-            y_high = df["Q_high"]
-            y_label = "Q"
+    # ---- tracked dips are computed once per (file, sweep, settings),
+    # on the shared worker pool
+    try:
+        with st.spinner("Tracking bands..."):
+            ordered, arrays = get_pool().run(
+                session_id(), f.pipeline.band_matrix, x_param
+            )
+    except PoolBusy as e:
+        st.warning(str(e))
+        st.stop()
+    n_bands = arrays["f0"].shape[1]
+    if not ordered or not n_bands:
+        st.warning(f"No bands found along {x_param}.")
+        st.stop()
+
+    bands = st.multiselect(
+        "Bands",
+        options=list(range(n_bands)),
+        default=list(range(n_bands)),
+        format_func=lambda b: f"Band {b + 1}",
+    )
 
-        elif y_metric == "fres":
-            y_low = df["low_fres (GHz)"]
-            y_high = df["high_fres (GHz)"]
-            y_label = "Resonant frequency (GHz)"
+    if st.button("Plot"):
+        import plotly.graph_objects as go
 
-        else:
+        x = np.array([r.config[x_param] for r in ordered])
+        # sensitivity is defined along a permittivity sweep only
+        er = x if x_param == "er" else None
+        if y_metric == "sensitivity" and er is None:
+            st.warning("Sensitivity needs er as the X parameter.")
             st.stop()
+        y = band_features(
+            arrays, [y_metric], er=er,
+            er_base=st.session_state.get("er_base", 1.0),
+        )[y_metric]
 
-        fig = go.Figure()
-
-        fig.add_trace(go.Scatter(
-            x=x,
-            y=y_low,
-            mode="lines+markers",
-            name="Low band"
-        ))
+        # ---- only rows that pass the filter
+        keep = {id(r) for r in filtered_results}
+        rows = np.array([id(r) in keep for r in ordered])
+        x, y = x[rows], y[rows]
 
-        fig.add_trace(go.Scatter(
-            x=x,
-            y=y_high,
-            mode="lines+markers",
-            name="High band"
-        ))
+        label, unit = BAND_FEATURES[y_metric]
+        fig = go.Figure()
+        for b in bands:
+            fig.add_trace(go.Scatter(
+                x=x,
+                y=y[:, b],
+                mode="lines+markers",
+                name=f"Band {b + 1}",
+            ))
 
         fig.update_layout(
-            title=f"{y_metric} vs {x_param}",
+            title=f"{label} vs {x_param}",
             xaxis_title=x_param,
-            yaxis_title=y_label,
+            yaxis_title=f"{label} ({unit})" if unit else label,
             height=520
         )
 
@@ -0,0 +1,104 @@
+import streamlit as st
+from pathlib import Path
+
+from core.auth import require_login
+from core.file import File
+from core.loading import load_run
+from core.storage import is_upload, upload_display_name
+from core.store import ResultStore, BAND_METRICS
+from core.table_view import parse_filter
+from core.workers import PoolBusy
+
+require_login()
+
+st.title("Search")
+st.caption("Query results across all runs without re-parsing")
+
+# =========================
+# Paths
+# =========================
+BASE_DIR = Path(__file__).resolve().parents[1]
+UPLOAD_DIR = BASE_DIR / "db" / "upload"
+STORE_PATH = BASE_DIR / "db" / "results.sqlite"
+
+# Rows returned per query
+QUERY_LIMIT = 5000
+
+store = ResultStore(STORE_PATH)
+
+# =========================
+# Index older runs
+# =========================
+run_dirs = (
+    sorted(d for d in UPLOAD_DIR.iterdir() if d.is_dir())
+    if UPLOAD_DIR.exists() else []
+)
+missing = sorted(
+    set(d.name for d in run_dirs) - set(store.indexed_runs()),
+    reverse=True
+)
+
+if missing:
+    st.info(f"{len(missing)} run(s) are not indexed yet.")
+    if st.button("Index missing runs"):
+        failed = []
+        try:
+            with st.spinner("Indexing..."):
+                for run_id in missing:
+                    files = [
+                        File(p, display_name=upload_display_name(p))
+                        for p in sorted((UPLOAD_DIR / run_id).iterdir())
+                        if is_upload(p)
+                    ]
+                    try:
+                        load_run(run_id, files, store, register=False)
+                    except ValueError as e:
+                        # e.g. multi-export zip archives stored before
+                        # they were refused; the other runs still index
+                        failed.append((run_id, e))
+        except PoolBusy as e:
+            st.warning(str(e))
+            st.stop()
+        if not failed:
+            st.rerun()
+        for run_id, e in failed:
+            st.error(f"Could not index run `{run_id}`: {e}")
+
+# =========================
+# Query
+# =========================
+st.caption(
+    "Format: column<op>value (space separated, op is = != > >= < <=). "
+    "Columns: config parameters, n_bands, n_points, or "
+    f"band<i>_<metric> with metric in {', '.join(BAND_METRICS)}"
+)
+st.caption(
+    "Band numbers here count the dips of each result on its own, in "
+    "frequency order. The Table and Plotting pages track bands along a "
+    "sweep instead, so their band<i> can differ where a dip enters or "
+    "leaves the span."
+)
+
+query_text = st.text_input(
+    "Query",
+    placeholder="er=3 band2_q>200"
+)
+
+try:
+    df = store.query(parse_filter(query_text), limit=QUERY_LIMIT)
+except Exception as e:
+    st.error(f"Query error: {e}")
+    st.stop()
+
+if df.empty:
+    st.warning("No results match the query.")
+    st.stop()
+
+st.markdown(f"**Matching results:** {len(df)}"
+            + (f" (first {QUERY_LIMIT})" if len(df) == QUERY_LIMIT else ""))
+
+st.dataframe(
+    df,
+    use_container_width=True,
+    hide_index=True
+)
@@ -0,0 +1,133 @@
+"""
+Cross-backend equivalence: every numba kernel must return exactly what
+the numpy kernel returns, and so must the dip extraction built on them.
+
+    python -m pytest tests
+"""
+import numpy as np
+import pytest
+
+from math_utils.kernels import FAR_WALK, NUMPY, get_backend
+from math_utils.signal_feature import extract_dips, track_dips
+
+
+pytest.importorskip("numba")
+NUMBA = get_backend("numba")
+
+CENTERS = (2.2, 3.1, 4.7)
+
+
+def trace(n: int, noise_db: float, seed: int = 0, shift: float = 0.0) -> np.ndarray:
+    """(n, 2) Lorentzian notches on 1–6 GHz, optional white noise"""
+    freq = np.linspace(1.0, 6.0, n)
+    s21 = np.zeros(n)
+    for c in CENTERS:
+        s21 -= 30.0 / (1 + ((freq - c - shift) / 0.03) ** 2)
+    s21 += np.random.default_rng(seed).normal(0.0, noise_db, n) if noise_db else 0.0
+    return np.c_[freq, s21]
+
+
+def as_tuples(dips) -> list:
+    return [
+        (d.f1.f, d.f1.s21, d.f0.f, d.f0.s21, d.f2.f, d.f2.s21)
+        for d in dips
+    ]
+
+
+@pytest.fixture(params=[(2001, 0.0), (2001, 0.2), (20001, 0.2)], ids=str)
+def data(request):
+    return trace(*request.param)
+
+
+# ============================================================
+# Kernels
+# ============================================================
+
+def test_kernels_are_cacheable():
+    # a closure over another kernel changes numba's cache key in every
+    # process, so that kernel would be recompiled on each cold start
+    for name in ("local_minima", "crossings", "refine", "near_minima"):
+        assert getattr(NUMBA, name).py_func.__closure__ is None, name
+
+
+def test_local_minima(data):
+    s21 = np.ascontiguousarray(data[:, 1])
+    np.testing.assert_array_equal(NUMBA.local_minima(s21), NUMPY.local_minima(s21))
+
+
+def test_crossings(data):
+    s21 = np.ascontiguousarray(data[:, 1])
+    idx = NUMPY.local_minima(s21)
+    # several levels per minimum, including unreachable ones
+    levels = s21[idx][:, None] + np.array([0.5, 3.0, 10.0, 40.0])[None, :]
+
+    left, right = NUMBA.crossings(s21, idx, levels)
+    ref_left, ref_right = NUMPY.crossings(s21, idx, levels)
+    np.testing.assert_array_equal(left, ref_left)
+    np.testing.assert_array_equal(right, ref_right)
+
+
+def test_crossings_far_and_at_the_edges():
+    # one crossing far beyond FAR_WALK on each side, none past it
+    n = 8 * FAR_WALK + 1
+    s21 = np.zeros(n)
+    s21[1:-1] = -np.hanning(n - 2) * 20.0
+    s21[0] = s21[-1] = 5.0
+    idx = np.array([0, 1, n // 2, n - 2, n - 1])
+    levels = np.c_[s21[idx] + 3.0, s21[idx] + 22.0, s21[idx] + 30.0]
+
+    left, right = NUMBA.crossings(s21, idx, levels)
+    ref_left, ref_right = NUMPY.crossings(s21, idx, levels)
+    np.testing.assert_array_equal(left, ref_left)
+    np.testing.assert_array_equal(right, ref_right)
+    assert ref_left[2, 1] == 0 and ref_right[2, 1] == n - 1
+
+
+def test_refine(data):
+    freq = np.ascontiguousarray(data[:, 0])
+    s21 = np.ascontiguousarray(data[:, 1])
+    idx = np.r_[0, NUMPY.local_minima(s21), len(s21) - 1]
+
+    for got, want in zip(NUMBA.refine(freq, s21, idx), NUMPY.refine(freq, s21, idx)):
+        np.testing.assert_array_equal(got, want)
+
+
+def test_near_minima(data):
+    freq, s21 = data[:, 0], data[:, 1]          # column views, as tracking
+    centers = np.array([0.5, 1.0, *CENTERS, 3.9, 6.0, 7.0])
+
+    for window in (1, 8, 40):
+        np.testing.assert_array_equal(
+            NUMBA.near_minima(freq, s21, centers, window),
+            NUMPY.near_minima(freq, s21, centers, window),
+        )
+
+
+# ============================================================
+# Extraction
+# ============================================================
+
+@pytest.mark.parametrize("settings", [
+    {},
+    {"threshold_db": 6.0, "min_spacing": 20},
+    {"min_prominence_db": 3.0, "smooth": 9},
+], ids=str)
+def test_extract_dips(data, settings):
+    assert as_tuples(extract_dips(data, backend="numba", **settings)) == \
+        as_tuples(extract_dips(data, backend="numpy", **settings))
+
+
+@pytest.mark.parametrize("noise_db", [0.0, 0.2])
+def test_track_dips(noise_db):
+    traces = [
+        trace(4001, noise_db, seed=k, shift=-0.01 * k) for k in range(40)
+    ]
+    settings = {"min_prominence_db": 3.0, "smooth": 9} if noise_db else {}
+
+    got = track_dips(traces, backend="numba", **settings)
+    want = track_dips(traces, backend="numpy", **settings)
+    assert [
+        {b: as_tuples([d]) for b, d in step.items()} for step in got
+    ] == [
+        {b: as_tuples([d]) for b, d in step.items()} for step in want
+    ]